@@ -1,34 +1,63 @@
-import os
-from dotenv import load_dotenv
 from flask import Flask, jsonify
 from .database import db
 from flask_jwt_extended import JWTManager
 from .routes import main
+from .instrumentation import init_query_counting, init_request_timing
+from .metrics import init_metrics
+from . import leaderboard
+from . import identity_cache
+from . import security
+from . import answer_keys
+from . import response_cache
+from .crud import configure_group_commit, configure_write_behind
+from . import sqlite_profile
+from .config import Config, engine_options
 
-# Cargar las variables de entorno
-load_dotenv()
-
-def create_app():
+def create_app(config=Config):
     app = Flask(__name__)
 
-    # Crear rutas a la db en la raíz
-    basedir = os.path.abspath(os.path.dirname(__file__))
-    db_path = os.path.join(basedir, '..', 'trivia.db')
+    # Configuración desde variables de entorno (ver app/config.py)
+    app.config.from_object(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
+    # Perfil de SQLite aplicado a cada conexión
+    sqlite_profile.configure(sqlite_profile.profile_from_config(app.config))
+
+    # Group commit de participaciones concurrentes
+    configure_group_commit(app.config['PARTICIPATION_GROUP_COMMIT_MS'])
+
+    # Escritura diferida de participaciones
+    configure_write_behind(
+        app,
+        app.config['PARTICIPATION_QUEUE_SIZE'] if app.config['PARTICIPATION_WRITE_BEHIND'] else 0,
+        app.config['PARTICIPATION_WRITE_BATCH'],
+        app.config['PARTICIPATION_ENQUEUE_TIMEOUT']
+    )
+
+    # Caché de identidad del usuario autenticado (middleware JWT)
+    identity_cache.configure(app.config['IDENTITY_CACHE_SIZE'], app.config['IDENTITY_CACHE_TTL'])
 
-    # Configuración de la base de datos
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(basedir, '..', 'trivia.db')}"
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Caché de respuestas de lectura
+    response_cache.configure(app.config['RESPONSE_CACHE_BYTES'])
 
-    # Configuración de JWT
-    app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
+    # Hash de contraseñas
+    security.configure(
+        app.config['PASSWORD_HASH_METHOD'],
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_QUEUE_LIMIT']
+    )
 
     # Inicializar extensiones db
     db.init_app(app)
 
-    # Crear la base de datos automáticamente si no existe
-    # if not os.path.exists(db_path):
-    with app.app_context():
-        db.create_all()
+    # El esquema se crea y actualiza con `python create_db.py` (ver app/migrations.py)
+
+    # Los leaderboards en memoria pertenecen a esta app; opcionalmente se precargan
+    leaderboard.invalidate()
+    answer_keys.invalidate()
+    if app.config['LEADERBOARD_WARM_ON_STARTUP']:
+        with app.app_context():
+            leaderboard.rebuild_all()
 
     # Inicializar extensiones jwt        
     jwt = JWTManager(app)
@@ -60,4 +89,13 @@ def create_app():
     # Registrar Blueprints
     app.register_blueprint(main)
 
+    # Contador de consultas por request
+    init_query_counting(app)
+
+    # Tiempos por request (Server-Timing) y consultas lentas
+    init_request_timing(app)
+
+    # Métricas Prometheus (/metrics)
+    init_metrics(app)
+
     return app
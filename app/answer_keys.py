@@ -0,0 +1,130 @@
+import threading
+from collections import OrderedDict
+from .database import db
+from .models import Trivia, Question, trivia_questions
+from . import versions
+
+# Claves de respuestas precompiladas por trivia.
+# Para cada trivia se guarda question_id -> (opciones correctas, puntaje) y el conjunto
+# de ids esperados, así corregir una participación es solo búsqueda en diccionarios.
+# La caché es por proceso. Cada clave guarda las versiones de la trivia y de las
+# preguntas con las que se compiló y, antes de usarla, se comparan con las versiones
+# actuales (una consulta por clave primaria), como en la caché de respuestas: una
+# pregunta o trivia modificada o eliminada en otro proceso vuelve a compilar la clave.
+# Además update_question, delete_question, update_trivia y delete_trivia eliminan en
+# este proceso las claves afectadas para liberar memoria.
+
+DIFFICULTY_POINTS = {"fácil": 1, "medio": 2, "difícil": 3}
+OPTION_KEYS = ("option_1", "option_2", "option_3")
+MAX_CACHED_KEYS = 4096
+
+
+class QuestionKey:
+    __slots__ = ('correct_keys', 'correct_option', 'difficulty', 'points')
+
+    def __init__(self, correct_keys, correct_option, difficulty, points):
+        self.correct_keys = correct_keys
+        self.correct_option = correct_option
+        self.difficulty = difficulty
+        self.points = points
+
+
+class AnswerKey:
+    __slots__ = ('trivia_id', 'name', 'questions', 'question_ids', 'version')
+
+    def __init__(self, trivia_id, name, questions, version=None):
+        self.trivia_id = trivia_id
+        self.name = name
+        self.questions = questions  # {id de pregunta (str): QuestionKey}, ordenado por id
+        self.question_ids = frozenset(questions)
+        self.version = version  # versiones de (trivia, preguntas) al compilar
+
+
+_keys = OrderedDict()
+_lock = threading.Lock()
+
+
+def _version(trivia_id):
+    return versions.current(versions.trivia(trivia_id), versions.QUESTIONS)
+
+
+# Compilar la clave de respuestas de una trivia (None si la trivia no existe)
+def compile_answer_key(trivia_id, version=None):
+    name = db.session.query(Trivia.name).filter(Trivia.id == trivia_id).scalar()
+    if name is None:
+        return None
+
+    rows = (
+        db.session.query(Question.id, Question.correct_option, Question.option_1,
+                         Question.option_2, Question.option_3, Question.difficulty)
+        .join(trivia_questions, trivia_questions.c.question_id == Question.id)
+        .filter(trivia_questions.c.trivia_id == trivia_id)
+        .order_by(Question.id)
+    )
+
+    questions = {}
+    for row in rows:
+        options = (row.option_1, row.option_2, row.option_3)
+        # Las opciones cuyo texto coincide con la respuesta correcta (puede no haber ninguna)
+        correct_keys = frozenset(key for key, value in zip(OPTION_KEYS, options) if value == row.correct_option)
+        points = DIFFICULTY_POINTS.get(row.difficulty, 0)
+        questions[str(row.id)] = QuestionKey(correct_keys, row.correct_option, row.difficulty, points)
+
+    return AnswerKey(trivia_id, name, questions, version)
+
+
+# Obtener la clave de respuestas de una trivia desde la caché (se vuelve a compilar si
+# la trivia o las preguntas cambiaron desde que se guardó)
+def get_answer_key(trivia_id):
+    version = _version(trivia_id)
+    with _lock:
+        key = _keys.get(trivia_id)
+        if key is not None and key.version == version:
+            _keys.move_to_end(trivia_id)
+            return key
+        if key is not None:
+            del _keys[trivia_id]
+
+    key = compile_answer_key(trivia_id, version)
+    if key is not None:
+        with _lock:
+            _keys[trivia_id] = key
+            while len(_keys) > MAX_CACHED_KEYS:
+                _keys.popitem(last=False)
+    return key
+
+
+# Corregir respuestas {id de pregunta: opción}; devuelve (puntaje, detalle por pregunta)
+def grade(answer_key, answers):
+    score = 0
+    correct_answers = {}
+
+    for question_id, question in answer_key.questions.items():
+        answer = answers.get(question_id)
+        is_correct = isinstance(answer, str) and answer in question.correct_keys
+        if is_correct:
+            score += question.points
+
+        correct_answers[int(question_id)] = {
+            "correct_answer": question.correct_option,
+            "difficulty": question.difficulty,
+            "is_correct": "correcta" if is_correct else "incorrecta"
+        }
+
+    return score, correct_answers
+
+
+def invalidate(trivia_id=None):
+    with _lock:
+        if trivia_id is None:
+            _keys.clear()
+        else:
+            _keys.pop(trivia_id, None)
+
+
+# Invalidar las claves de las trivias que contienen una pregunta
+def invalidate_question(question_id):
+    question_id = str(question_id)
+    with _lock:
+        for trivia_id in [t for t, key in _keys.items() if question_id in key.question_ids]:
+            del _keys[trivia_id]
@@ -1,2 +1,117 @@
-SQLALCHEMY_DATABASE_URI = "sqlite:///./local_db.db"
-SQLALCHEMY_TRACK_MODIFICATIONS = False  # Para deshabilitar la advertencia sobre modificaciones
+import os
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+from .security import DEFAULT_METHOD
+
+# Configuración de la aplicación.
+# Todos los valores se leen de variables de entorno al importar este módulo; los
+# puntos de entrada (run.py, app/main.py, create_db.py) cargan antes el archivo .env.
+# create_app recibe una de estas clases, o cualquier objeto con los mismos atributos.
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# Base de datos SQLite en la raíz del proyecto
+DEFAULT_DATABASE_URI = f"sqlite:///{os.path.join(basedir, '..', 'trivia.db')}"
+
+
+def _env_bool(name, default):
+    return os.getenv(name, "1" if default else "0") == "1"
+
+
+# Procesos de hash por worker: los núcleos repartidos entre los workers de gunicorn
+# (WEB_CONCURRENCY), así el total de procesos de hash no supera los núcleos
+def _default_hash_workers():
+    web_workers = max(int(os.getenv("WEB_CONCURRENCY", 1)), 1)
+    return max((os.cpu_count() or 1) // web_workers, 1)
+
+
+class Config:
+    # Base de datos y pool de conexiones
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URI)
+    SQLALCHEMY_TRACK_MODIFICATIONS = False  # Para deshabilitar la advertencia sobre modificaciones
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))  # 0 = sin pool (una conexión por uso)
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", -1))  # segundos; -1 = nunca
+    DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", False)
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 500))
+
+    # Perfil de SQLite aplicado a cada conexión (SQLITE_PROFILE=0 lo desactiva)
+    SQLITE_PROFILE = _env_bool("SQLITE_PROFILE", True)
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64000))
+    SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))
+
+    # Exponer el número de consultas SQL por request (cabecera X-Query-Count)
+    QUERY_COUNT_HEADER = _env_bool("QUERY_COUNT_HEADER", False)
+
+    # Cabecera Server-Timing y log JSON por request; log de consultas más lentas que SLOW_QUERY_MS (0 = desactivado)
+    REQUEST_TIMING = _env_bool("REQUEST_TIMING", False)
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 0))
+
+    # Endpoint /metrics (Prometheus) y medición de cada request
+    METRICS = _env_bool("METRICS", True)
+
+    # JWT
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+
+    # Group commit de participaciones concurrentes (0 = un commit por participación)
+    PARTICIPATION_GROUP_COMMIT_MS = float(os.getenv("PARTICIPATION_GROUP_COMMIT_MS", 0))
+
+    # Escritura diferida de participaciones: la respuesta no espera el commit
+    PARTICIPATION_WRITE_BEHIND = _env_bool("PARTICIPATION_WRITE_BEHIND", False)
+    PARTICIPATION_QUEUE_SIZE = int(os.getenv("PARTICIPATION_QUEUE_SIZE", 10000))
+    PARTICIPATION_WRITE_BATCH = int(os.getenv("PARTICIPATION_WRITE_BATCH", 500))
+    PARTICIPATION_ENQUEUE_TIMEOUT = float(os.getenv("PARTICIPATION_ENQUEUE_TIMEOUT", 0.5))
+
+    # Caché de identidad del usuario autenticado (middleware JWT)
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", 10000))
+    IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", 60))
+
+    # Caché de respuestas de lectura en bytes por proceso (0 = desactivada)
+    RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", 32 * 1024 * 1024))
+
+    # Hash de contraseñas: método/costo y pool de procesos (0 procesos = en el mismo hilo)
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", DEFAULT_METHOD)
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", _default_hash_workers()))
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 4 * PASSWORD_HASH_WORKERS))
+
+    # Reconstruir los rankings en memoria al iniciar
+    LEADERBOARD_WARM_ON_STARTUP = _env_bool("LEADERBOARD_WARM_ON_STARTUP", False)
+
+
+class TestingConfig(Config):
+    TESTING = True
+    # Las pruebas usan SQLite en memoria salvo que TEST_DATABASE_URL indique otra base,
+    # que debe estar vacía (cada prueba la deja vacía al terminar)
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:")
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "clave-de-pruebas-no-usar-en-produccion")
+
+
+# Opciones de create_engine a partir de la configuración del pool
+def engine_options(config):
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = {"query_cache_size": config['DB_STATEMENT_CACHE_SIZE']}
+
+    # SQLite en memoria usa una única conexión compartida (StaticPool de Flask-SQLAlchemy)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+
+    options["pool_pre_ping"] = config['DB_POOL_PRE_PING']
+    options["pool_recycle"] = config['DB_POOL_RECYCLE']
+
+    if not config['DB_POOL_SIZE']:
+        options["poolclass"] = NullPool
+        return options
+
+    options["pool_size"] = config['DB_POOL_SIZE']
+    options["max_overflow"] = config['DB_MAX_OVERFLOW']
+
+    # SQLite en archivo usa NullPool por defecto; con un pool las conexiones (y sus
+    # PRAGMA) se reutilizan entre requests y pueden pasar de un hilo a otro
+    if url.get_backend_name() == 'sqlite':
+        options["poolclass"] = QueuePool
+        options["connect_args"] = {"check_same_thread": False}
+
+    return options
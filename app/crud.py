@@ -1,22 +1,42 @@
-from .models import User, Question, Trivia, Participate, Ranking
+from sqlalchemy import func
+from sqlalchemy.exc import StatementError
+from .models import User, Question, Trivia, Participate, Ranking, trivia_questions, trivia_users
 from .database import db
+from .loading import TRIVIA_WITH_RELATIONS, TRIVIA_WITH_QUESTIONS
+from . import leaderboard
+from . import identity_cache
+from . import answer_keys
+from .group_commit import GroupCommitter
+from . import write_behind
+from .write_behind import WriteBehindQueue
+from .sqlite_profile import retry_on_locked, is_locked_error
+from . import versions
+from .pagination import keyset_page, DEFAULT_PAGE_SIZE
 
 # Registrar un usuario
+@retry_on_locked
 def register_user(name, email, hashed_password, role="jugador"):
     user = User(name=name, email=email, password=hashed_password, role=role)
     db.session.add(user)
     db.session.commit()
+
+    # Puede haber quedado en caché como inexistente
+    identity_cache.invalidate(user.id)
+    return user
+
+# Reemplazar el hash de la contraseña de un usuario
+@retry_on_locked
+def update_password_hash(user, hashed_password):
+    user.password = hashed_password
+    db.session.commit()
     return user
 
 # Obtener un usuario por campo email
 def get_user_by_email(email):
     return User.query.filter_by(email=email).first()
 
-# Obtener todos los usuarios
-def get_users():
-    return User.query.all()
-
 # Actualizar/Modificar un usuario
+@retry_on_locked
 def update_user(user_id, new_data):
     user = User.query.get(user_id)
     if not user:
@@ -24,19 +44,29 @@ def update_user(user_id, new_data):
     user.name = new_data.get('name', user.name)
     user.email = new_data.get('email', user.email)
     user.role = new_data.get('role', user.role)
+    versions.bump(versions.USERS)
     db.session.commit()
+    identity_cache.invalidate(user_id)
+
+    # Los leaderboards guardan el nombre del usuario
+    leaderboard.invalidate()
     return user
 
 # Borrar un usuario
+@retry_on_locked
 def delete_user(user_id):
     user = User.query.get(user_id)
     if not user:
         return None
     db.session.delete(user)
+    versions.bump(versions.USERS)
     db.session.commit()
+    identity_cache.invalidate(user_id)
+    leaderboard.invalidate()
     return True
 
 # Crear una pregunta
+@retry_on_locked
 def create_question(question_text, correct_option, options, difficulty):
     question = Question(
         question_text=question_text,
@@ -50,11 +80,59 @@ def create_question(question_text, correct_option, options, difficulty):
     db.session.commit()
     return question
 
-# Obtener todas las preguntas
-def get_questions():
-    return Question.query.all()
+# Filas por transacción en las importaciones masivas
+BULK_BATCH_SIZE = 500
+
+# Fila de la tabla question a partir de los datos validados de una pregunta
+def _question_values(data):
+    options = data['options']
+    return {
+        "question_text": data['question_text'],
+        "correct_option": data['correct_option'],
+        "option_1": options[0],
+        "option_2": options[1],
+        "option_3": options[2],
+        "difficulty": data['difficulty']
+    }
+
+# Insertar filas de preguntas en una transacción; se reintenta sola ante un lock, así
+# nunca se repite un INSERT ya confirmado
+@retry_on_locked
+def _insert_questions(values):
+    try:
+        db.session.execute(Question.__table__.insert(), values)
+        db.session.commit()
+    except StatementError:
+        db.session.rollback()
+        raise
+
+# Crear un lote de preguntas en una sola transacción (executemany).
+# Si el lote falla se reintenta fila por fila para identificar las filas inválidas.
+# Devuelve (insertadas, [(posición en el lote, mensaje de error)])
+def bulk_create_questions(rows):
+    values = [_question_values(row) for row in rows]
+    try:
+        _insert_questions(values)
+        return len(values), []
+    except StatementError as e:
+        # Un lock que persiste después de los reintentos no es un error de las filas
+        if is_locked_error(e):
+            raise
+
+    inserted = 0
+    errors = []
+    for position, row_values in enumerate(values):
+        try:
+            _insert_questions([row_values])
+            inserted += 1
+        except StatementError as e:
+            if is_locked_error(e):
+                raise
+            errors.append((position, f"Datos inválidos: {e.orig}"))
+    return inserted, errors
 
 # Actualizar/Modificar una pregunta
+@retry_on_locked
 def update_question(question_id, new_data):
     question = Question.query.get(question_id)
     if not question:
@@ -65,41 +143,100 @@ def update_question(question_id, new_data):
     question.option_2 = new_data.get('options', {}).get('option_2', question.option_2)
     question.option_3 = new_data.get('options', {}).get('option_3', question.option_3)
     question.difficulty = new_data.get('difficulty', question.difficulty)
+    versions.bump(versions.QUESTIONS)
     db.session.commit()
+    answer_keys.invalidate_question(question_id)
     return question
 
 # Borrar una pregunta
+@retry_on_locked
 def delete_question(question_id):
     question = Question.query.get(question_id)
     if not question:
         return None
     db.session.delete(question)
+    versions.bump(versions.QUESTIONS)
     db.session.commit()
+    answer_keys.invalidate_question(question_id)
     return True
 
-# Crear una trivia
-def create_trivia(name, description, user_ids, question_ids,):
+# SQLite admite como máximo 999 parámetros por consulta en versiones antiguas
+SQLITE_MAX_PARAMS = 900
 
-    trivia = Trivia(name=name, description=description)
+# Dividir una lista de ids en bloques que respeten el límite de parámetros
+def _id_chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), SQLITE_MAX_PARAMS):
+        yield ids[start:start + SQLITE_MAX_PARAMS]
+
+# Normalizar una lista de ids: enteros, sin repetidos y en el orden recibido.
+# Se aceptan enteros y textos con solo dígitos; None si no es una lista o si algún
+# elemento es otra cosa (true/false, decimales como 1.9, textos no numéricos)
+def normalize_ids(ids):
+    if not isinstance(ids, list):
+        return None
+    normalized = []
+    for i in ids:
+        if isinstance(i, int) and not isinstance(i, bool):
+            normalized.append(i)
+        elif isinstance(i, str) and i.isascii() and i.isdigit():
+            normalized.append(int(i))
+        else:
+            return None
+    return list(dict.fromkeys(normalized))
+
+# Obtener cuáles de los ids de preguntas existen (consultas IN por bloques)
+def get_existing_question_ids(question_ids):
+    existing = set()
+    for chunk in _id_chunks(question_ids):
+        existing.update(row.id for row in db.session.query(Question.id).filter(Question.id.in_(chunk)))
+    return existing
 
-    for question_id in question_ids:
-        question = Question.query.get(question_id)
-        trivia.questions.append(question)
+# Obtener {id: nombre} de los usuarios existentes entre los ids (consultas IN por bloques)
+def get_user_names(user_ids):
+    names = {}
+    for chunk in _id_chunks(user_ids):
+        names.update(db.session.query(User.id, User.name).filter(User.id.in_(chunk)))
+    return names
 
-    for user_id in user_ids:
-        user = User.query.get(user_id)
-        trivia.users.append(user)
+# Reemplazar las filas de una tabla de asociación de la trivia con un solo executemany
+def _set_trivia_links(trivia_id, table, column, ids):
+    db.session.execute(table.delete().where(table.c.trivia_id == trivia_id))
+    if ids:
+        db.session.execute(table.insert(), [{"trivia_id": trivia_id, column: i} for i in ids])
+
+# Crear una trivia (los ids ya validados por la ruta)
+@retry_on_locked
+def create_trivia(name, description, user_ids, question_ids,):
 
+    trivia = Trivia(name=name, description=description)
     db.session.add(trivia)
+    db.session.flush()
+
+    # Asociaciones en bloque en lugar de cargar cada pregunta y usuario
+    _set_trivia_links(trivia.id, trivia_questions, 'question_id', question_ids)
+    _set_trivia_links(trivia.id, trivia_users, 'user_id', user_ids)
+    versions.bump(versions.TRIVIAS, versions.trivia(trivia.id), versions.ranking(trivia.id))
     db.session.commit()
 
     return trivia
 
-# Obtener todas las trivias
-def get_trivias():
-    return Trivia.query.all()
+# Obtener una página de trivias (con preguntas y usuarios precargados)
+def get_trivias(limit=DEFAULT_PAGE_SIZE, after=None):
+    query = Trivia.query.options(*TRIVIA_WITH_RELATIONS)
+    return keyset_page(query, [(Trivia.id, False)], limit, after, lambda t: [t.id])
+
+# Obtener una trivia por id (con preguntas y usuarios precargados)
+def get_trivia(trivia_id):
+    return Trivia.query.options(*TRIVIA_WITH_RELATIONS).filter_by(id=trivia_id).first()
+
+# Obtener una página de las trivias de un usuario (con preguntas precargadas)
+def get_trivias_by_user(user_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    query = Trivia.query.options(*TRIVIA_WITH_QUESTIONS).join(Trivia.users).filter(User.id == user_id)
+    return keyset_page(query, [(Trivia.id, False)], limit, after, lambda t: [t.id])
 
 # Actualizar/Modificar una trivia
+@retry_on_locked
 def update_trivia(trivia_id, new_data):
     trivia = Trivia.query.get(trivia_id)
     if not trivia:
@@ -107,51 +244,160 @@ def update_trivia(trivia_id, new_data):
     trivia.name = new_data.get('name', trivia.name)
     trivia.description = new_data.get('description', trivia.description)
 
-    # Actualizar preguntas asociadas
-    question_ids = new_data.get('question_ids', [])
+    # Actualizar preguntas asociadas (se ignoran los ids que no existen)
+    question_ids = normalize_ids(new_data.get('question_ids') or [])
     if question_ids:
-        trivia.questions = [Question.query.get(q_id) for q_id in question_ids if Question.query.get(q_id)]
+        existing = get_existing_question_ids(question_ids)
+        _set_trivia_links(trivia_id, trivia_questions, 'question_id', [i for i in question_ids if i in existing])
 
-    # Actualizar usuarios asociados
-    user_ids = new_data.get('user_ids', [])
+    # Actualizar usuarios asociados (se ignoran los ids que no existen)
+    user_ids = normalize_ids(new_data.get('user_ids') or [])
     if user_ids:
-        trivia.users = [User.query.get(u_id) for u_id in user_ids if User.query.get(u_id)]
+        names = get_user_names(user_ids)
+        _set_trivia_links(trivia_id, trivia_users, 'user_id', [i for i in user_ids if i in names])
 
+    versions.bump(versions.TRIVIAS, versions.trivia(trivia_id), versions.ranking(trivia_id))
     db.session.commit()
+
+    # Las relaciones se escribieron directamente en las tablas de asociación
+    db.session.expire(trivia, ['questions', 'users'])
+    answer_keys.invalidate(trivia_id)
     return trivia
 
 # Borrar una trivia
+@retry_on_locked
 def delete_trivia(trivia_id):
     trivia = Trivia.query.get(trivia_id)
     if not trivia:
         return None
     db.session.delete(trivia)
+    versions.bump(versions.TRIVIAS, versions.trivia(trivia_id), versions.ranking(trivia_id))
     db.session.commit()
+    leaderboard.invalidate(trivia_id)
+    answer_keys.invalidate(trivia_id)
     return True
 
 
-# Crear una participacion
-def create_participation(user_name, trivia_id, answers, score):
+# Group commit opcional de participaciones concurrentes (None = desactivado)
+_group_committer = None
 
-    participation = Participate(user_name=user_name, trivia_id=trivia_id, answers=answers, score=score)
+# Activar el group commit con una ventana en milisegundos (0 lo desactiva)
+def configure_group_commit(window_ms):
+    global _group_committer
+    _group_committer = GroupCommitter(_write_submission_group, window_ms / 1000) if window_ms > 0 else None
 
-    db.session.add(participation)
-    db.session.commit()
-    
-    return participation
+def group_commit_stats():
+    return _group_committer.stats() if _group_committer else None
 
-# Obtener todas las trivias
-def get_trivias():
-    return Trivia.query.all()
+# Escribir un grupo de participaciones (y sus rankings) en una transacción; devuelve los ids de ranking
+@retry_on_locked
+def _write_submission_group(entries):
+    ranking_ids = []
+    with db.engine.begin() as connection:
+        for e in entries:
+            connection.execute(Participate.__table__.insert(), {
+                "user_name": e["user_name"], "trivia_id": e["trivia_id"], "answers": e["answers"], "score": e["score"]
+            })
+            result = connection.execute(Ranking.__table__.insert(), {
+                "trivia_id": e["trivia_id"], "user_id": e["user_id"], "score": e["score"]
+            })
+            ranking_ids.append(result.inserted_primary_key[0])
+        versions.bump(*(versions.ranking(e["trivia_id"]) for e in entries), connection=connection)
+    return ranking_ids
 
+# Escritura diferida opcional de participaciones (None = desactivada)
+_write_behind = None
 
-# Crear un ranking
-def create_ranking(trivia_id, user_id, score):
+# Activar la cola de escritura diferida (max_size = 0 la desactiva).
+# El hilo escritor necesita la app para abrir su propio contexto.
+def configure_write_behind(app, max_size=0, batch_size=write_behind.DEFAULT_BATCH_SIZE,
+                           enqueue_timeout=write_behind.DEFAULT_ENQUEUE_TIMEOUT):
+    global _write_behind
+    if _write_behind is not None:
+        write_behind.unregister(_write_behind)
+        _write_behind = None
 
-    ranking = Ranking(trivia_id=trivia_id, user_id=user_id, score=score)
+    if max_size > 0:
+        def write_batch(entries):
+            with app.app_context():
+                return _write_submission_group(entries)
 
-    db.session.add(ranking)
-    db.session.commit()
-    
-    return ranking
+        _write_behind = write_behind.register(
+            WriteBehindQueue(write_batch, _record_submissions, max_size, batch_size, enqueue_timeout)
+        )
+
+def write_behind_enabled():
+    return _write_behind is not None
+
+def write_behind_stats():
+    return _write_behind.stats() if _write_behind else None
+
+# Esperar a que las participaciones encoladas estén guardadas
+def flush_submissions():
+    if _write_behind:
+        _write_behind.flush()
+
+# Agregar al leaderboard las participaciones que el hilo escritor ya guardó
+def _record_submissions(entries, ranking_ids):
+    for e, ranking_id in zip(entries, ranking_ids):
+        leaderboard.record(e["trivia_id"], ranking_id, e["user_id"], e["user_name"], e["score"])
+
+# Encolar una participación ya corregida; lanza QueueFull si la cola sigue llena
+def enqueue_submission(user_id, user_name, trivia_id, answers, score):
+    entry = {"user_id": user_id, "user_name": user_name, "trivia_id": trivia_id, "answers": answers, "score": score}
+    _write_behind.submit(entry)
+
+# Registrar una participación y su ranking en una sola transacción (un solo commit).
+# Si falla no queda una participación sin ranking. Devuelve el id del ranking.
+def create_submission(user_id, user_name, trivia_id, answers, score):
+    if _group_committer:
+        entry = {"user_id": user_id, "user_name": user_name, "trivia_id": trivia_id, "answers": answers, "score": score}
+        return _group_committer.submit(entry)
+    return _save_submission(user_id, user_name, trivia_id, answers, score)
+
+@retry_on_locked
+def _save_submission(user_id, user_name, trivia_id, answers, score):
+    try:
+        participation = Participate(user_name=user_name, trivia_id=trivia_id, answers=answers, score=score)
+        ranking = Ranking(trivia_id=trivia_id, user_id=user_id, score=score)
+        db.session.add(participation)
+        db.session.add(ranking)
+        versions.bump(versions.ranking(trivia_id))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return ranking.id
+
+# Obtener {nombre: id} de los usuarios con esos nombres (el primero registrado si se repite)
+def get_user_ids_by_name(names):
+    ids = {}
+    for chunk in _id_chunks(set(names)):
+        rows = db.session.query(User.name, func.min(User.id)).filter(User.name.in_(chunk)).group_by(User.name)
+        ids.update(rows)
+    return ids
+
+# Guardar muchas participaciones con sus rankings en una sola transacción (executemany).
+# Si falla no se guarda ninguna y la sesión queda lista para seguir usándose.
+# entries: dicts con user_id, user_name, trivia_id, answers y score
+@retry_on_locked
+def create_participations(entries):
+    if not entries:
+        return 0
 
+    try:
+        db.session.execute(Participate.__table__.insert(), [
+            {"user_name": e["user_name"], "trivia_id": e["trivia_id"], "answers": e["answers"], "score": e["score"]}
+            for e in entries
+        ])
+        db.session.execute(Ranking.__table__.insert(), [
+            {"trivia_id": e["trivia_id"], "user_id": e["user_id"], "score": e["score"]}
+            for e in entries
+        ])
+        versions.bump(*(versions.ranking(e["trivia_id"]) for e in entries))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(entries)
@@ -0,0 +1,86 @@
+import threading
+import time
+
+# Group commit de escrituras concurrentes.
+# El primer hilo que llega se convierte en líder: espera una ventana corta, toma todo
+# lo que se acumuló mientras tanto y lo escribe en una sola transacción (un solo
+# fsync). Los demás hilos esperan el resultado de su elemento. Si la transacción
+# del grupo falla, cada elemento se reintenta por separado para que un error no
+# afecte al resto.
+
+
+class _Pending:
+    __slots__ = ('item', 'done', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class GroupCommitter:
+    def __init__(self, write_batch, window, max_batch=256):
+        self.write_batch = write_batch  # lista de elementos -> lista de resultados
+        self.window = window            # segundos que el líder espera a otros hilos
+        self.max_batch = max_batch
+        self._pending = []
+        self._leader = False
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    # Escribir un elemento y esperar a que su grupo haga commit
+    def submit(self, item):
+        pending = _Pending(item)
+        with self._lock:
+            self._pending.append(pending)
+            lead = not self._leader
+            if lead:
+                self._leader = True
+
+        if lead:
+            self._lead()
+        pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _lead(self):
+        time.sleep(self.window)
+        while True:
+            with self._lock:
+                group = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                if not group:
+                    self._leader = False
+                    return
+            self._commit(group)
+
+    def _commit(self, group):
+        try:
+            results = self.write_batch([p.item for p in group])
+            for pending, result in zip(group, results):
+                pending.result = result
+        except Exception:
+            for pending in group:
+                try:
+                    pending.result = self.write_batch([pending.item])[0]
+                except Exception as e:
+                    pending.error = e
+
+        with self._lock:
+            self.batches += 1
+            self.items += len(group)
+        for pending in group:
+            pending.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "window_ms": self.window * 1000,
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0
+            }
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+from .database import db
+from .models import User
+
+# Caché por proceso de la identidad del usuario autenticado (id -> existe, rol).
+# Evita consultar la tabla user en cada request autenticado. Es acotada (LRU) y
+# cada entrada vence después de ttl segundos; update_user, delete_user y
+# register_user invalidan la entrada del usuario afectado.
+
+DEFAULT_MAXSIZE = 10000
+DEFAULT_TTL = 60
+
+
+class Identity:
+    __slots__ = ('exists', 'role')
+
+    def __init__(self, exists, role=None):
+        self.exists = exists
+        self.role = role
+
+
+class IdentityCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def set(self, user_id, identity):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, identity)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+cache = IdentityCache()
+
+
+# Reiniciar la caché con la configuración de la app
+def configure(maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+    global cache
+    cache = IdentityCache(maxsize, ttl)
+
+
+# Obtener la identidad de un usuario, consultando la base de datos solo si no está en caché
+def lookup(user_id):
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return Identity(False)
+
+    identity = cache.get(user_id)
+    if identity is None:
+        role = db.session.query(User.role).filter(User.id == user_id).scalar()
+        identity = Identity(role is not None, role)
+        cache.set(user_id, identity)
+    return identity
+
+
+def invalidate(user_id=None):
+    cache.invalidate(int(user_id) if user_id is not None else None)
+
+
+def stats():
+    return cache.stats()
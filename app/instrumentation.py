@@ -0,0 +1,199 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Instrumentación de requests y consultas SQL.
+# Los listeners se registran sobre la clase Engine, así cubren cualquier engine que
+# cree Flask-SQLAlchemy. Nada se registra si la instrumentación está desactivada, y
+# las mediciones dentro del código (timed) solo revisan un booleano. Cada create_app
+# vuelve a asignar esos valores desde su configuración, también cuando la desactiva.
+#
+# - count_queries(): cuenta las consultas de un bloque (pruebas).
+# - QUERY_COUNT_HEADER: cabecera X-Query-Count.
+# - REQUEST_TIMING: cabecera Server-Timing (db, auth, serialize, total) y una línea de
+#   log JSON por request en el logger "app.requests".
+# - SLOW_QUERY_MS: registra en el logger "app.slow_queries" el SQL de las consultas
+#   más lentas que el umbral.
+
+request_logger = logging.getLogger("app.requests")
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+_active_counters = []
+_request_counting = False
+_timing_enabled = False
+_slow_query_seconds = None
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+
+# Tiempos acumulados de un request
+class RequestTiming:
+    __slots__ = ('start', 'queries', 'db', 'spans')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.spans = {}
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active_counters:
+        counter.count += 1
+        counter.statements.append(statement)
+
+    if _request_counting and has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def _ensure_listener():
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    if _timing_enabled and has_request_context():
+        timing = g.get('_timing')
+        if timing is not None:
+            timing.queries += 1
+            timing.db += elapsed
+
+    if _slow_query_seconds is not None and elapsed >= _slow_query_seconds:
+        slow_query_logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(elapsed * 1000, 3),
+            "path": request.path if has_request_context() else None,
+            "sql": " ".join(statement.split()),
+            "executemany": executemany
+        }, ensure_ascii=False))
+
+
+def _ensure_timers():
+    if not event.contains(Engine, "before_cursor_execute", _start_query_timer):
+        event.listen(Engine, "before_cursor_execute", _start_query_timer)
+        event.listen(Engine, "after_cursor_execute", _stop_query_timer)
+
+
+# Contar las consultas ejecutadas dentro de un bloque (útil en pruebas)
+@contextmanager
+def count_queries():
+    _ensure_listener()
+    counter = QueryCounter()
+    _active_counters.append(counter)
+    try:
+        yield counter
+    finally:
+        _active_counters.remove(counter)
+
+
+# Medir un tramo del request (p. ej. "auth"); sin costo si REQUEST_TIMING está desactivado
+@contextmanager
+def timed(name):
+    if not _timing_enabled or not has_request_context() or g.get('_timing') is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        g._timing.add(name, time.perf_counter() - start)
+
+
+# Exponer el número de consultas de cada request en la cabecera X-Query-Count
+def init_query_counting(app):
+    global _request_counting
+
+    _request_counting = bool(app.config.get('QUERY_COUNT_HEADER'))
+    if not _request_counting:
+        return
+
+    _ensure_listener()
+
+    @app.after_request
+    def add_query_count_header(response):
+        response.headers['X-Query-Count'] = str(g.get('query_count', 0))
+        return response
+
+
+# Encoder JSON que suma el tiempo de serialización al request en curso
+def _timing_encoder(base):
+    class TimingJSONEncoder(base):
+        def encode(self, o):
+            start = time.perf_counter()
+            try:
+                return super().encode(o)
+            finally:
+                timing = g.get('_timing') if has_request_context() else None
+                if timing is not None:
+                    timing.add("serialize", time.perf_counter() - start)
+    return TimingJSONEncoder
+
+
+def _server_timing(timing, total):
+    parts = [f'db;dur={timing.db * 1000:.2f};desc="{timing.queries} queries"']
+    parts += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timing.spans.items()]
+    parts.append(f'total;dur={total * 1000:.2f}')
+    return ", ".join(parts)
+
+
+# Server-Timing, log por request y log de consultas lentas según la configuración
+def init_request_timing(app):
+    global _timing_enabled, _slow_query_seconds
+
+    slow_query_ms = app.config.get('SLOW_QUERY_MS') or 0
+    _slow_query_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else None
+    if _slow_query_seconds is not None:
+        _ensure_timers()
+
+    _timing_enabled = bool(app.config.get('REQUEST_TIMING'))
+    if not _timing_enabled:
+        return
+
+    _ensure_timers()
+    app.json_encoder = _timing_encoder(app.json_encoder)
+
+    @app.before_request
+    def start_request_timing():
+        g._timing = RequestTiming()
+
+    @app.after_request
+    def add_server_timing(response):
+        timing = g.get('_timing')
+        if timing is None:
+            return response
+        total = time.perf_counter() - timing.start
+        response.headers['Server-Timing'] = _server_timing(timing, total)
+
+        if request_logger.isEnabledFor(logging.INFO):
+            request_logger.info(json.dumps({
+                "event": "request",
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "status": response.status_code,
+                "duration_ms": round(total * 1000, 3),
+                "db_ms": round(timing.db * 1000, 3),
+                "queries": timing.queries,
+                **{f"{name}_ms": round(seconds * 1000, 3) for name, seconds in timing.spans.items()}
+            }))
+        return response
@@ -0,0 +1,282 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from .database import db
+from .models import Trivia
+from .projections import rankings_since
+from . import versions
+
+# Leaderboard en memoria por trivia, mantenido de forma incremental.
+#
+# Orden y desempate:
+#   - Las entradas (filas de Ranking) se ordenan por puntaje descendente y, a igual
+#     puntaje, por id ascendente (quien registró primero el puntaje va primero).
+#   - "rank" es ranking de competición (1, 2, 2, 4): 1 + cantidad de entradas con
+#     puntaje estrictamente mayor. "dense_rank" es ranking denso (1, 2, 2, 3).
+#   - La posición de un usuario es la de su mejor entrada.
+#
+# Estructura: un árbol de Fenwick indexado por puntaje cuenta las entradas por
+# puntaje (rank en O(log S)), y cada puntaje tiene su lista de entradas ordenada por
+# id (búsqueda con bisect). Top-K y vecinos cuestan O(log n + K).
+#
+# Cada proceso mantiene sus propios leaderboards. Antes de cada lectura se traen de
+# la tabla Ranking las filas con id mayor al último sincronizado (una consulta por
+# índice), así también se ven los puntajes registrados por otros procesos.
+# Esta marca de agua supone que los ids se confirman en orden, como en SQLite (las
+# escrituras son serializadas). En un servidor de base de datos una transacción con un
+# id menor puede confirmarse después y su fila no se vería hasta reconstruir el
+# leaderboard; por eso los leaderboards incrementales solo se garantizan con SQLite.
+# Las filas ya cargadas no se vuelven a leer: cada leaderboard guarda las versiones de
+# USERS (nombres de usuario, usuarios eliminados) y de su trivia (trivia eliminada o id
+# reutilizado) con las que se construyó, y se reconstruye completo cuando alguna cambió,
+# también si el cambio lo hizo otro proceso. invalidate solo libera memoria en este proceso.
+
+
+class Entry:
+    __slots__ = ('id', 'user_id', 'user_name', 'score')
+
+    def __init__(self, id, user_id, user_name, score):
+        self.id = id
+        self.user_id = user_id
+        self.user_name = user_name
+        self.score = score
+
+    @property
+    def key(self):
+        return [self.score, self.id]
+
+
+class _Fenwick:
+    def __init__(self, size=64):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def _grow(self, index):
+        counts = [self.prefix(i) - self.prefix(i - 1) for i in range(self.size)]
+        while index >= self.size:
+            self.size *= 2
+        self.tree = [0] * (self.size + 1)
+        for i, count in enumerate(counts):
+            if count:
+                self.add(i, count)
+
+    def add(self, index, delta):
+        if index >= self.size:
+            self._grow(index)
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    # Cantidad de entradas con puntaje <= index
+    def prefix(self, index):
+        if index < 0:
+            return 0
+        i = min(index, self.size - 1) + 1
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+class Leaderboard:
+    def __init__(self, version=None):
+        self.lock = threading.RLock()
+        self.version = version  # versiones de (USERS, trivia) al construirlo
+        self.synced_id = 0
+        self.total = 0
+        self._counts = _Fenwick()
+        self._scores = []      # puntajes distintos, ascendente
+        self._buckets = {}     # puntaje -> entradas ordenadas por id
+        self._bucket_ids = {}  # puntaje -> ids (para bisect)
+        self._best = {}        # user_id -> mejor entrada
+        self._ids = set()
+
+    def add(self, entry):
+        with self.lock:
+            if entry.id in self._ids:
+                return
+            self._ids.add(entry.id)
+
+            score = entry.score
+            if score not in self._buckets:
+                insort(self._scores, score)
+                self._buckets[score] = []
+                self._bucket_ids[score] = []
+
+            ids = self._bucket_ids[score]
+            position = bisect_left(ids, entry.id)
+            ids.insert(position, entry.id)
+            self._buckets[score].insert(position, entry)
+
+            self._counts.add(score, 1)
+            self.total += 1
+
+            best = self._best.get(entry.user_id)
+            if best is None or (score, -entry.id) > (best.score, -best.id):
+                self._best[entry.user_id] = entry
+
+    # Rank de competición de un puntaje
+    def rank(self, score):
+        return self.total - self._counts.prefix(score) + 1
+
+    # Rank denso de un puntaje
+    def dense_rank(self, score):
+        return len(self._scores) - bisect_right(self._scores, score) + 1
+
+    # Recorrer entradas desde (puntaje, índice dentro del puntaje) hacia abajo
+    def _iter_forward(self, score_index, position):
+        while score_index >= 0:
+            bucket = self._buckets[self._scores[score_index]]
+            for i in range(position, len(bucket)):
+                yield bucket[i]
+            score_index -= 1
+            position = 0
+
+    # Recorrer entradas desde (puntaje, índice dentro del puntaje) hacia arriba
+    def _iter_backward(self, score_index, position):
+        while score_index < len(self._scores):
+            bucket = self._buckets[self._scores[score_index]]
+            for i in range(position, -1, -1):
+                yield bucket[i]
+            score_index += 1
+            if score_index < len(self._scores):
+                position = len(self._buckets[self._scores[score_index]]) - 1
+
+    # Página de entradas después de la clave (puntaje, id), sin incluirla
+    def page(self, limit, after=None):
+        with self.lock:
+            if not self._scores:
+                return [], None
+
+            if after is None:
+                start = (len(self._scores) - 1, 0)
+            else:
+                score, entry_id = after
+                score_index = bisect_right(self._scores, score) - 1
+                if score_index < 0:
+                    return [], None
+                if self._scores[score_index] == score:
+                    position = bisect_right(self._bucket_ids[score], entry_id)
+                    start = (score_index, position)
+                else:
+                    start = (score_index, 0)
+
+            entries = []
+            for entry in self._iter_forward(*start):
+                if len(entries) == limit:
+                    return entries, entries[-1].key
+                entries.append(entry)
+            return entries, None
+
+    def top(self, k):
+        return self.page(k)[0]
+
+    # Posición del usuario (mejor entrada) y sus vecinos inmediatos
+    def around(self, user_id, radius):
+        with self.lock:
+            entry = self._best.get(user_id)
+            if entry is None:
+                return None
+
+            score_index = bisect_left(self._scores, entry.score)
+            position = bisect_left(self._bucket_ids[entry.score], entry.id)
+
+            above = []
+            backward = self._iter_backward(score_index, position)
+            next(backward)
+            for neighbor in backward:
+                if len(above) == radius:
+                    break
+                above.append(neighbor)
+
+            below = []
+            forward = self._iter_forward(score_index, position)
+            next(forward)
+            for neighbor in forward:
+                if len(below) == radius:
+                    break
+                below.append(neighbor)
+
+            return {
+                "entry": entry,
+                "rank": self.rank(entry.score),
+                "dense_rank": self.dense_rank(entry.score),
+                "above": list(reversed(above)),
+                "below": below
+            }
+
+
+_boards = {}
+_registry_lock = threading.Lock()
+
+
+# Lotes de recursos por consulta de versiones en rebuild_all
+VERSION_BATCH_SIZE = 500
+
+
+def _version(trivia_id):
+    return versions.current(versions.USERS, versions.trivia(trivia_id))
+
+
+# Leaderboard de la trivia para las versiones actuales (uno vacío si no existe o cambió)
+def _board(trivia_id, version):
+    with _registry_lock:
+        board = _boards.get(trivia_id)
+        if board is None or board.version != version:
+            board = _boards[trivia_id] = Leaderboard(version)
+        return board
+
+
+# Obtener el leaderboard de una trivia, sincronizado con la tabla Ranking
+def get_leaderboard(trivia_id):
+    board = _board(trivia_id, _version(trivia_id))
+    with board.lock:
+        for row in rankings_since(trivia_id, board.synced_id):
+            board.add(Entry(row.id, row.user_id, row.user_name, row.score))
+            board.synced_id = max(board.synced_id, row.id)
+    return board
+
+
+# Registrar un puntaje recién guardado (después del commit)
+def record(trivia_id, ranking_id, user_id, user_name, score):
+    with _registry_lock:
+        board = _boards.get(trivia_id)
+    # Si la trivia aún no está cargada se leerá completa en la próxima consulta
+    if board is not None:
+        board.add(Entry(ranking_id, user_id, user_name, score))
+
+
+# Descartar leaderboards de este proceso (libera memoria); los demás procesos detectan
+# el cambio por las versiones y los reconstruyen al consultarse
+def invalidate(trivia_id=None):
+    with _registry_lock:
+        if trivia_id is None:
+            _boards.clear()
+        else:
+            _boards.pop(trivia_id, None)
+
+
+# Reconstruir todos los leaderboards desde la tabla Ranking (al iniciar la app)
+def rebuild_all():
+    # Versiones leídas antes que las filas: un cambio concurrente deja una versión vieja
+    # (o ninguna, si la trivia es nueva) y el leaderboard se reconstruye al consultarse
+    trivia_ids = [trivia_id for trivia_id, in db.session.query(Trivia.id)]
+    board_versions = {}
+    for start in range(0, len(trivia_ids), VERSION_BATCH_SIZE):
+        batch = trivia_ids[start:start + VERSION_BATCH_SIZE]
+        users_version, *trivia_versions = versions.current(versions.USERS, *map(versions.trivia, batch))
+        for trivia_id, trivia_version in zip(batch, trivia_versions):
+            board_versions[trivia_id] = (users_version, trivia_version)
+
+    boards = {}
+    for row in rankings_since(None):
+        board = boards.get(row.trivia_id)
+        if board is None:
+            board = boards[row.trivia_id] = Leaderboard(board_versions.get(row.trivia_id))
+        board.add(Entry(row.id, row.user_id, row.user_name, row.score))
+        board.synced_id = max(board.synced_id, row.id)
+
+    with _registry_lock:
+        _boards.clear()
+        _boards.update(boards)
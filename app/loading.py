@@ -0,0 +1,17 @@
+from sqlalchemy.orm import selectinload
+from .models import Trivia
+
+# Estrategias de carga por endpoint.
+# Cada una trae el grafo de objetos que serializa su endpoint en un número fijo
+# de consultas (una por nivel), sin importar cuántas trivias haya.
+
+# GET /trivias y GET /trivias/<id>: trivia + preguntas + usuarios (3 consultas)
+TRIVIA_WITH_RELATIONS = (
+    selectinload(Trivia.questions),
+    selectinload(Trivia.users),
+)
+
+# GET /users/<id>/trivias: trivias del usuario + preguntas de cada trivia (2 consultas)
+TRIVIA_WITH_QUESTIONS = (
+    selectinload(Trivia.questions),
+)
@@ -0,0 +1,198 @@
+import functools
+import os
+import time
+from contextlib import contextmanager
+from flask import Response, g, request
+from prometheus_client import (
+    REGISTRY, CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.pool import Pool, QueuePool
+from .database import db
+from . import response_cache
+
+# Métricas en formato de texto de Prometheus (GET /metrics).
+# Con varios workers (gunicorn.conf.py) cada proceso escribe sus valores en archivos
+# propios dentro de PROMETHEUS_MULTIPROC_DIR y /metrics suma los de todos los procesos
+# al responder; sin esa variable los valores quedan en la memoria del proceso.
+# Registrar un valor no toma locks compartidos entre procesos.
+#
+# - trivia_http_requests_total y trivia_http_request_duration_seconds por endpoint
+#   del blueprint (main.participate, main.ranking, ...) y código de estado. La duración
+#   termina al cerrarse la respuesta, así incluye el cuerpo de las exportaciones en
+#   streaming; un request que termina con una excepción se cuenta con estado 500.
+# - trivia_http_requests_in_flight por endpoint.
+# - trivia_db_pool_*: conexiones abiertas, prestadas y capacidad del pool.
+# - trivia_password_hash_seconds: tiempo de hash y verificación de contraseñas.
+# - trivia_response_cache_*: aciertos/fallos y bytes de la caché de respuestas.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+UNMATCHED_ENDPOINT = "unmatched"  # 404 y 405: la ruta no identifica un endpoint
+
+REQUESTS = Counter(
+    "trivia_http_requests_total", "Requests atendidos",
+    ["endpoint", "method", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "trivia_http_request_duration_seconds", "Duración de los requests en segundos",
+    ["endpoint", "status"], buckets=LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "trivia_http_requests_in_flight", "Requests en curso",
+    ["endpoint"], multiprocess_mode="livesum"
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "trivia_db_pool_connections", "Conexiones a la base de datos abiertas",
+    multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "trivia_db_pool_checked_out", "Conexiones prestadas a un request",
+    multiprocess_mode="livesum"
+)
+DB_POOL_CAPACITY = Gauge(
+    "trivia_db_pool_max_connections", "Conexiones máximas del pool (pool_size + max_overflow)",
+    multiprocess_mode="livesum"
+)
+DB_POOL_CHECKOUTS = Counter(
+    "trivia_db_pool_checkouts_total", "Préstamos de conexiones del pool"
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "trivia_password_hash_seconds", "Tiempo de hash (hash) y verificación (verify) de contraseñas",
+    ["operation"], buckets=HASH_BUCKETS
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "trivia_password_hash_rejected_total", "Operaciones de hash rechazadas por cola llena"
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "trivia_response_cache_lookups_total", "Búsquedas en la caché de respuestas",
+    ["result"]
+)
+RESPONSE_CACHE_BYTES = Gauge(
+    "trivia_response_cache_bytes", "Bytes usados por la caché de respuestas",
+    multiprocess_mode="livesum"
+)
+
+_enabled = False
+_capacity_pid = None
+
+
+def _multiprocess_dir():
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def _on_connect(dbapi_connection, connection_record):
+    DB_POOL_CONNECTIONS.inc()
+
+
+def _on_close(dbapi_connection, connection_record=None):
+    DB_POOL_CONNECTIONS.dec()
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+    DB_POOL_CHECKOUTS.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def _ensure_pool_listeners():
+    if event.contains(Pool, "checkout", _on_checkout):
+        return
+    event.listen(Pool, "connect", _on_connect)
+    event.listen(Pool, "close", _on_close)
+    event.listen(Pool, "close_detached", _on_close)
+    event.listen(Pool, "checkout", _on_checkout)
+    event.listen(Pool, "checkin", _on_checkin)
+
+
+# Capacidad del pool de este proceso; se publica una vez por proceso (también después de un fork)
+def _publish_pool_capacity():
+    global _capacity_pid
+    if _capacity_pid == os.getpid():
+        return
+    _capacity_pid = os.getpid()
+    pool = db.engine.pool
+    if isinstance(pool, QueuePool) and pool._max_overflow >= 0:
+        DB_POOL_CAPACITY.set(pool.size() + pool._max_overflow)
+
+
+# Medir una operación de hash de contraseñas (operation: "hash" o "verify")
+@contextmanager
+def hash_timer(operation):
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    yield
+    PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - start)
+
+
+def hash_rejected():
+    if _enabled:
+        PASSWORD_HASH_REJECTED.inc()
+
+
+def cache_lookup(hit):
+    if _enabled:
+        RESPONSE_CACHE_LOOKUPS.labels("hit" if hit else "miss").inc()
+
+
+# Texto de exposición con los valores de todos los procesos
+def render():
+    if _multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+# Contar un request terminado y liberar su lugar en trivia_http_requests_in_flight
+def _finish_request(endpoint, method, status, start):
+    REQUESTS.labels(endpoint, method, status).inc()
+    REQUEST_LATENCY.labels(endpoint, status).observe(time.perf_counter() - start)
+    IN_FLIGHT.labels(endpoint).dec()
+    RESPONSE_CACHE_BYTES.set(response_cache.cache.bytes)
+
+
+# Registrar /metrics y la medición de cada request según la configuración
+def init_metrics(app):
+    global _enabled
+
+    _enabled = bool(app.config.get('METRICS'))
+    if not _enabled:
+        return
+
+    _ensure_pool_listeners()
+
+    @app.before_request
+    def start_request_metrics():
+        _publish_pool_capacity()
+        g._metrics_endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        g._metrics_start = time.perf_counter()
+        IN_FLIGHT.labels(g._metrics_endpoint).inc()
+
+    # Se registra al cerrar la respuesta (después de enviar el cuerpo, también en streaming)
+    @app.after_request
+    def record_request_metrics(response):
+        endpoint = g.pop('_metrics_endpoint', None)
+        if endpoint is not None:
+            response.call_on_close(functools.partial(
+                _finish_request, endpoint, request.method, str(response.status_code), g._metrics_start
+            ))
+        return response
+
+    # teardown se ejecuta siempre: si after_request no llegó a ejecutarse el request
+    # terminó con una excepción
+    @app.teardown_request
+    def finish_request_metrics(error=None):
+        endpoint = g.pop('_metrics_endpoint', None)
+        if endpoint is not None:
+            _finish_request(endpoint, request.method, "500", g._metrics_start)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(render(), headers={"Content-Type": CONTENT_TYPE_LATEST})
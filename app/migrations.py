@@ -0,0 +1,64 @@
+from sqlalchemy import inspect, text
+from .database import db
+from .schema import ensure_indexes
+from . import search
+
+# Migraciones versionadas del esquema.
+# La versión aplicada se guarda en la tabla schema_version. create_db.py aplica las
+# migraciones pendientes en orden, cada una en su propia transacción; create_app ya no
+# toca el esquema al iniciar. Para cambiar el esquema se agrega una función al final
+# de MIGRATIONS (nunca se modifica una migración ya publicada).
+
+
+# 1: tablas de los modelos (no modifica las tablas que ya existen)
+def _create_tables(connection):
+    db.metadata.create_all(bind=connection)
+
+
+# 2: índices secundarios en bases de datos creadas antes de que existieran
+def _add_indexes(connection):
+    ensure_indexes(connection)
+
+
+# 3: índice de texto completo de las preguntas (FTS5, solo SQLite) con sus triggers
+def _add_question_search(connection):
+    search.create_index(connection)
+
+
+# 4: índice (trivia_id, id) de ranking para sincronizar los leaderboards
+def _add_ranking_sync_index(connection):
+    ensure_indexes(connection)
+
+
+MIGRATIONS = [
+    (1, "Esquema inicial", _create_tables),
+    (2, "Índices secundarios", _add_indexes),
+    (3, "Búsqueda de texto completo de preguntas", _add_question_search),
+    (4, "Índice de ranking por trivia e id", _add_ranking_sync_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# Versión del esquema de la base de datos (0 si nunca se migró)
+def current_version(engine):
+    if not inspect(engine).has_table("schema_version"):
+        return 0
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+# Aplicar las migraciones pendientes; devuelve [(versión, descripción)] de las aplicadas
+def migrate(engine, target=LATEST_VERSION):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY)"))
+
+    applied = []
+    for version, description, upgrade in MIGRATIONS:
+        if version > target or version <= current_version(engine):
+            continue
+        with engine.begin() as connection:
+            upgrade(connection)
+            connection.execute(text("INSERT INTO schema_version (version) VALUES (:version)"), {"version": version})
+        applied.append((version, description))
+    return applied
@@ -53,7 +53,7 @@ class Question(db.Model):
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)  # participate busca por nombre
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(255), nullable=False)  # Pass hasheada
     role = db.Column(db.String(20), nullable=False, default="jugador")
@@ -78,6 +78,11 @@ class Participate(db.Model):
     # Relación con User
     user = db.relationship('User', backref='participations') 
 
+    # Participaciones de un usuario en una trivia
+    __table_args__ = (
+        db.Index('ix_participate_trivia_user', 'trivia_id', 'user_name'),
+    )
+
     def __repr__(self):
         return f'<Participate {self.user_name}>'
 
@@ -94,7 +99,24 @@ class Ranking(db.Model):
     # Relación con User
     user = db.relationship('User', backref='rankings')
 
+    # Ranking de una trivia ordenado por puntaje (el id va implícito en el índice) y
+    # filas nuevas de una trivia por id (sincronización de los leaderboards)
+    __table_args__ = (
+        db.Index('ix_ranking_trivia_score', 'trivia_id', db.desc('score')),
+        db.Index('ix_ranking_trivia_id', 'trivia_id', 'id'),
+    )
+
     def __repr__(self):
         return f'<Ranking {self.user_id}>'
 
 
+
+
+# Versión de cada recurso cacheable (ETag); los mutadores la incrementan en la misma transacción
+class ResourceVersion(db.Model):
+    __tablename__ = 'resource_version'
+    resource = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ResourceVersion {self.resource}={self.version}>'
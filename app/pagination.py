@@ -0,0 +1,96 @@
+import base64
+import json
+from sqlalchemy import and_, or_
+from .database import db
+
+# Paginación por cursor (keyset).
+# Cada página filtra "después de la última clave vista" en vez de usar OFFSET,
+# así el costo de una página no crece con el tamaño de la tabla.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+class Page:
+    def __init__(self, items, next_key=None):
+        self.items = items
+        self.next_key = next_key
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self.next_key) if self.next_key is not None else None
+
+
+# Codificar la clave de la última fila como un token opaco
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+# Decodificar un token generado por encode_cursor
+def decode_cursor(token, size):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidPageRequest("Cursor inválido")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidPageRequest("Cursor inválido")
+    return values
+
+
+# Leer ?limit= y ?after= de la query string
+def page_args(args, key_size=1):
+    limit = args.get('limit', DEFAULT_PAGE_SIZE)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise InvalidPageRequest("El parámetro limit debe ser un número entero")
+
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise InvalidPageRequest(f"El parámetro limit debe estar entre 1 y {MAX_PAGE_SIZE}")
+
+    after = args.get('after')
+    if after:
+        after = decode_cursor(after, key_size)
+    return limit, after or None
+
+
+# Condición "(k1, k2, ...) viene después de values" respetando la dirección de cada columna
+def _after_condition(keys, values):
+    conditions = []
+    for i, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        conditions.append(and_(*equal_prefix, step))
+    return or_(*conditions)
+
+
+# Obtener una página de la query ordenada por keys = [(columna, descendente), ...]
+def keyset_page(query, keys, limit, after, row_key):
+    if after is not None:
+        query = query.filter(_after_condition(keys, after))
+
+    order = [column.desc() if descending else column.asc() for column, descending in keys]
+    return _page(query.order_by(*order).limit(limit + 1).all(), limit, row_key)
+
+
+# Lo mismo para un select() de Core: filas livianas (Row) que no pasan por el ORM
+def keyset_select(statement, keys, limit, after, row_key):
+    if after is not None:
+        statement = statement.where(_after_condition(keys, after))
+
+    order = [column.desc() if descending else column.asc() for column, descending in keys]
+    return _page(db.session.execute(statement.order_by(*order).limit(limit + 1)).all(), limit, row_key)
+
+
+def _page(rows, limit, row_key):
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return Page(rows, row_key(rows[-1]))
+    return Page(rows)
@@ -0,0 +1,67 @@
+from sqlalchemy import select
+from .database import db
+from .models import User, Question, Ranking
+from .pagination import keyset_select, DEFAULT_PAGE_SIZE
+from .streaming import EXPORT_BATCH_SIZE
+
+# Consultas de solo lectura para los listados, exportaciones y leaderboards.
+# Seleccionan solo las columnas que usa la respuesta con select() de Core sobre las
+# tablas (sin entidades del ORM): las filas no se convierten en objetos, no pasan por
+# el identity map ni quedan en la sesión. Cada fila es una tupla liviana (Row) con
+# acceso por nombre, así las vistas leen row.name igual que con un modelo.
+
+_users = User.__table__
+_questions = Question.__table__
+_rankings = Ranking.__table__
+
+USER_COLUMNS = (_users.c.id, _users.c.name, _users.c.email, _users.c.role)
+QUESTION_COLUMNS = (
+    _questions.c.id, _questions.c.question_text, _questions.c.option_1, _questions.c.option_2,
+    _questions.c.option_3, _questions.c.correct_option, _questions.c.difficulty
+)
+RANKING_COLUMNS = (
+    _rankings.c.id, _rankings.c.trivia_id, _rankings.c.user_id, _rankings.c.score,
+    _users.c.name.label('user_name')
+)
+
+
+# Página de usuarios ordenada por id: filas (id, name, email, role)
+def get_users(limit=DEFAULT_PAGE_SIZE, after=None):
+    return keyset_select(select(*USER_COLUMNS), [(_users.c.id, False)], limit, after, lambda u: [u.id])
+
+
+# Página de preguntas ordenada por id
+def get_questions(limit=DEFAULT_PAGE_SIZE, after=None):
+    return keyset_select(select(*QUESTION_COLUMNS), [(_questions.c.id, False)], limit, after, lambda q: [q.id])
+
+
+# Recorrer todas las preguntas por lotes (para exportaciones en streaming)
+def iter_questions():
+    statement = select(*QUESTION_COLUMNS).order_by(_questions.c.id)
+    return db.session.execute(statement).yield_per(EXPORT_BATCH_SIZE)
+
+
+# Filas de ranking con el nombre del usuario (un solo JOIN) e id mayor a after_id,
+# ordenadas por id; trivia_id None incluye todas las trivias. Con trivia_id el rango
+# (trivia_id, id > after_id) se lee del índice ix_ranking_trivia_id, ya ordenado por id,
+# así una sincronización sin filas nuevas no recorre el ranking de la trivia
+def rankings_since(trivia_id, after_id=0):
+    statement = (
+        select(*RANKING_COLUMNS)
+        .join(_users, _rankings.c.user_id == _users.c.id)
+        .where(_rankings.c.id > after_id)
+    )
+    if trivia_id is not None:
+        statement = statement.where(_rankings.c.trivia_id == trivia_id)
+    return db.session.execute(statement.order_by(_rankings.c.id)).yield_per(EXPORT_BATCH_SIZE)
+
+
+# Recorrer el ranking completo de una trivia por lotes: filas (id, score, user_name)
+def iter_ranking(trivia_id):
+    statement = (
+        select(_rankings.c.id, _rankings.c.score, _users.c.name.label('user_name'))
+        .join(_users, _rankings.c.user_id == _users.c.id)
+        .where(_rankings.c.trivia_id == trivia_id)
+        .order_by(_rankings.c.score.desc(), _rankings.c.id.asc())
+    )
+    return db.session.execute(statement).yield_per(EXPORT_BATCH_SIZE)
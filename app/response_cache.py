@@ -0,0 +1,166 @@
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response
+from . import versions
+from . import metrics
+
+# Caché por proceso de respuestas de lectura (GET de trivias y rankings).
+# Cada entrada guarda el cuerpo ya serializado junto con el ETag de las versiones de
+# los recursos que incluye. Antes de usar una entrada se compara su ETag con las
+# versiones actuales (una consulta por clave primaria), así una escritura hecha en
+# otro proceso nunca devuelve datos viejos. Además, cada versions.bump elimina en
+# este proceso las entradas de los recursos modificados para liberar memoria.
+# La caché es un LRU acotado por bytes.
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+ENTRY_OVERHEAD = 200  # bytes aproximados por entrada además del cuerpo y la clave
+
+
+class CachedResponse:
+    __slots__ = ('etag', 'body', 'mimetype', 'tags', 'size')
+
+    def __init__(self, etag, body, mimetype, tags, size):
+        self.etag = etag
+        self.body = body
+        self.mimetype = mimetype
+        self.tags = tags
+        self.size = size
+
+
+class ResponseCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 4
+        self._entries = OrderedDict()
+        self._tags = {}  # recurso -> claves de las entradas que lo incluyen
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # Entrada vigente para la clave (None si no existe o su ETag ya no es el actual)
+    def get(self, key, etag):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.etag == etag:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, entry):
+        if not self.max_bytes or entry.size > self.max_entry_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.bytes += entry.size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    # Eliminar las entradas que incluyen alguno de los recursos (None = todas)
+    def invalidate(self, resources=None):
+        with self._lock:
+            if resources is None:
+                keys = list(self._entries)
+            else:
+                keys = set()
+                for resource in resources:
+                    keys.update(self._tags.get(resource, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+cache = ResponseCache()
+
+
+# Reiniciar la caché con la configuración de la app (0 bytes la desactiva)
+def configure(max_bytes=DEFAULT_MAX_BYTES):
+    global cache
+    cache = ResponseCache(max_bytes)
+
+
+def invalidate(resources=None):
+    cache.invalidate(resources)
+
+
+versions.on_bump(invalidate)
+
+
+def stats():
+    return cache.stats()
+
+
+# Clave de la respuesta: ruta y query string (las vistas cacheadas no dependen del rol)
+def _cache_key():
+    return request.path, request.query_string
+
+
+# Cachear una vista GET. resources(**view_args) devuelve los recursos que incluye la
+# respuesta; su ETag se envía al cliente y un If-None-Match vigente responde 304.
+# Solo se guardan las respuestas 200.
+def cached_response(resources):
+    def wrapper(fn):
+        @wraps(fn)
+        def decorated_function(*args, **kwargs):
+            tags = resources(**kwargs)
+            etag = versions.etag(*tags, variant=request.query_string.decode())
+
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+                response.set_etag(etag)
+                return response
+
+            key = _cache_key()
+            entry = cache.get(key, etag)
+            metrics.cache_lookup(entry is not None)
+            if entry is not None:
+                response = make_response(entry.body, 200)
+                response.mimetype = entry.mimetype
+                response.set_etag(etag)
+                return response
+
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                body = response.get_data()
+                size = len(body) + len(request.path) + len(request.query_string) + ENTRY_OVERHEAD
+                cache.set(key, CachedResponse(etag, body, response.mimetype, frozenset(tags), size))
+                response.set_etag(etag)
+            return response
+        return decorated_function
+    return wrapper
@@ -1,27 +1,89 @@
-from flask import Flask, Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, json
 from .crud import (
-    get_users, update_user, delete_user, 
-    get_questions, create_question, update_question, delete_question,
-    get_trivias, create_trivia, update_trivia, delete_trivia, register_user,
-    get_user_by_email, create_participation, create_ranking
+    update_user, delete_user, 
+    create_question, bulk_create_questions, BULK_BATCH_SIZE,
+    update_question, delete_question,
+    update_password_hash, get_trivias, get_trivia, get_trivias_by_user, create_trivia,
+    update_trivia, delete_trivia, register_user, get_user_by_email, create_submission,
+    group_commit_stats, create_participations, get_user_ids_by_name, normalize_ids, get_existing_question_ids,
+    get_user_names, write_behind_enabled, enqueue_submission, write_behind_stats
 )
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from .projections import get_users, get_questions, iter_questions, iter_ranking
+from .pagination import page_args, encode_cursor, InvalidPageRequest
+from . import leaderboard
+from . import identity_cache
+from . import versions
+from . import response_cache
+from .response_cache import cached_response
+from .answer_keys import get_answer_key, grade, DIFFICULTY_POINTS
+from .search import search_questions, InvalidSearch
+from .security import hash_password, verify_password, needs_rehash, HashingBusy, stats as security_stats
+from .streaming import export_response, EXPORT_FORMATS
+from .write_behind import QueueFull
+from .sqlite_profile import is_locked_error
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from werkzeug.exceptions import BadRequest
 from app.models import Question, Trivia, Ranking, User
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, StatementError
 from datetime import timedelta
 from middlewares.middlewares import jwt_required_middleware
 import re
 import os
 
-app = Flask(__name__)
-
 main = Blueprint('main', __name__)
 
-# Configuración JWT
-app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
-jwt = JWTManager(app)
+
+# Leer ?format= de una exportación, devuelve None si no es válido
+def export_format_arg():
+    export_format = request.args.get('format', 'json')
+    return export_format if export_format in EXPORT_FORMATS else None
+
+
+# Validar los datos de una pregunta, devuelve el mensaje de error o None
+def question_error(data):
+    if not isinstance(data, dict) or not all(key in data for key in ['question_text', 'correct_option', 'options', 'difficulty']):
+        return "Faltan datos necesarios"
+
+    # Validar que se proporcionen exactamente 3 opciones
+    if not isinstance(data['options'], (list, tuple)) or len(data['options']) != 3:
+        return "Debes proporcionar exactamente 3 alternativas por pregunta."
+    return None
+
+
+# Filas de una importación masiva: arreglo JSON o NDJSON leído en streaming
+def bulk_rows():
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+    else:
+        data = request.get_json()
+        if isinstance(data, dict):
+            data = data.get('questions')
+        if not isinstance(data, list):
+            raise BadRequest("Se esperaba un arreglo de preguntas")
+        yield from data
+
+
+# Respuesta cuando el pool de hash o la cola de escrituras están saturados
+def server_busy_response():
+    return jsonify({
+        "code": "503",
+        "message": "El servidor está ocupado, intenta nuevamente en unos segundos"
+    }), 503
+
+
+# Respuesta para parámetros de paginación inválidos
+def invalid_page_response(error):
+    return jsonify({
+        "code": "400",
+        "message": f"Parámetros de paginación inválidos: {error}"
+    }), 400
 
 # Endpoint para registrar usuarios
 @main.route('/register', methods=['POST'])
@@ -64,7 +126,7 @@ def register():
             }), 400
 
         # Registrar usuario en la base de datos
-        user = register_user(name, email, generate_password_hash(password), role)
+        user = register_user(name, email, hash_password(password), role)
 
         return jsonify({"code": "201", "message": "Usuario registrado", "user": {"id": user.id, "name": user.name, "role": user.role}}), 201
 
@@ -75,6 +137,9 @@ def register():
             "message": "El usuario ya existe"
         }), 400
 
+    except HashingBusy:
+        return server_busy_response()
+
     except Exception as e:
         # Manejo de otros errores internos
         return jsonify({
@@ -101,9 +166,16 @@ def login():
     # Buscar al usuario por email
     user = get_user_by_email(email)
     
-    # Si no se encuentra el usuario o la contraseña es incorrecta
-    if not user or not check_password_hash(user.password, password):
-        return jsonify({"code": "401", "message": "Credenciales inválidas"}), 401
+    try:
+        # Si no se encuentra el usuario o la contraseña es incorrecta
+        if not user or not verify_password(user.password, password):
+            return jsonify({"code": "401", "message": "Credenciales inválidas"}), 401
+
+        # Actualizar hashes creados con un método o costo anterior
+        if needs_rehash(user.password):
+            update_password_hash(user, hash_password(password))
+    except HashingBusy:
+        return server_busy_response()
 
     # Crear el token de acceso con identidad como el ID del usuario (convertido a string)
     access_token = create_access_token(
@@ -122,13 +194,19 @@ def login():
 @main.route('/users', methods=['GET'])
 @jwt_required_middleware(role="admin")
 def get_users_route():
-    users = get_users()
+    try:
+        limit, after = page_args(request.args)
+    except InvalidPageRequest as e:
+        return invalid_page_response(e)
+
+    page = get_users(limit, after)
     return jsonify({
         "code": "200",
         "message": "Usuarios recuperados exitosamente",
         "data": [
-            {"id": user.id, "name": user.name, "email": user.email, "rol": user.role} for user in users
-        ]
+            {"id": user.id, "name": user.name, "email": user.email, "rol": user.role} for user in page.items
+        ],
+        "next_cursor": page.next_cursor
     }), 200
 
 
@@ -177,18 +255,12 @@ def create_question_route():
 
     data = request.get_json()
 
-    # Validación de campos obligatorios
-    if not all(key in data for key in ['question_text', 'correct_option', 'options', 'difficulty']):
+    # Validación de campos obligatorios y de las 3 opciones
+    error = question_error(data)
+    if error:
         return jsonify({
             "code": "400",
-            "message": "Faltan datos necesarios"
-        }), 400
-    
-    # Validar que se proporcionen exactamente 3 opciones
-    if len(data['options']) != 3:
-        return jsonify({
-            "code": "400",
-            "message": "Debes proporcionar exactamente 3 alternativas por pregunta."
+            "message": error
         }), 400
 
     try:
@@ -228,13 +300,71 @@ def create_question_route():
         }), 500
     
 
+# Endpoint para crear preguntas de forma masiva (arreglo JSON o NDJSON)
+@main.route('/questions/bulk', methods=['POST'])
+@jwt_required_middleware(role="admin")
+def bulk_create_questions_route():
+    inserted = 0
+    errors = []
+    batch = []
+    batch_indexes = []
+
+    # Insertar el lote acumulado y registrar los errores por fila
+    def flush():
+        nonlocal inserted
+        count, failed = bulk_create_questions(batch)
+        inserted += count
+        for position, message in failed:
+            errors.append({"index": batch_indexes[position], "message": message})
+        batch.clear()
+        batch_indexes.clear()
+
+    try:
+        for index, row in enumerate(bulk_rows()):
+            error = "JSON inválido" if row is None else question_error(row)
+            if error:
+                errors.append({"index": index, "message": error})
+                continue
+
+            batch.append(row)
+            batch_indexes.append(index)
+            if len(batch) >= BULK_BATCH_SIZE:
+                flush()
+
+        if batch:
+            flush()
+
+    except BadRequest as e:
+        return jsonify({
+            "code": "400",
+            "message": "La solicitud es incorrecta: " + str(e)
+        }), 400
+
+    status = 201 if inserted or not errors else 400
+    return jsonify({
+        "code": str(status),
+        "message": f"Se importaron {inserted} preguntas",
+        "data": {
+            "inserted": inserted,
+            "failed": len(errors),
+            "errors": errors
+        }
+    }), status
+
+
 # Endpoint para obtener todas las preguntas
 @main.route('/questions', methods=['GET'])
 @jwt_required_middleware(role="admin")
 def get_questions_route():
-    questions = get_questions()
+    try:
+        limit, after = page_args(request.args)
+    except InvalidPageRequest as e:
+        return invalid_page_response(e)
 
-    if not questions:
+    page = get_questions(limit, after)
+    questions = page.items
+
+    if not questions and not after:
         return jsonify({
             "code": "404",
             "message": "No se encontraron preguntas.",
@@ -260,7 +390,8 @@ def get_questions_route():
             "code": "200",
             "length": len(response_data),
             "message": "Preguntas recuperadas exitosamente",
-            "data": response_data
+            "data": response_data,
+            "next_cursor": page.next_cursor
         }), 200
     except IntegrityError as e:
         return jsonify({
@@ -281,6 +412,81 @@ def get_questions_route():
         }), 500
 
 
+# Endpoint para buscar preguntas por palabras clave (texto y opciones), ordenadas por relevancia
+@main.route('/questions/search', methods=['GET'])
+@jwt_required_middleware(role="admin")
+def search_questions_route():
+    try:
+        limit, after = page_args(request.args, key_size=2)
+        if after and not (isinstance(after[0], (int, float)) and isinstance(after[1], int)):
+            raise InvalidPageRequest("Cursor inválido")
+    except InvalidPageRequest as e:
+        return invalid_page_response(e)
+
+    difficulty = request.args.get('difficulty')
+    if difficulty and difficulty not in DIFFICULTY_POINTS:
+        return jsonify({
+            "code": "400",
+            "message": "La dificultad debe ser 'fácil', 'medio' o 'difícil'"
+        }), 400
+
+    try:
+        page = search_questions(request.args.get('q'), difficulty, limit, after)
+    except InvalidSearch as e:
+        return jsonify({
+            "code": "400",
+            "message": str(e)
+        }), 400
+
+    return jsonify({
+        "code": "200",
+        "length": len(page.items),
+        "message": "Búsqueda realizada exitosamente",
+        "data": [
+            {
+                "id": q.id,
+                "question_text": q.question_text,
+                "options": {
+                    "option_1": q.option_1,
+                    "option_2": q.option_2,
+                    "option_3": q.option_3
+                },
+                "correct_option": q.correct_option,
+                "difficulty": q.difficulty
+            }
+            for q in page.items
+        ],
+        "next_cursor": page.next_cursor
+    }), 200
+
+
+# Endpoint para exportar todas las preguntas en streaming (JSON o NDJSON)
+@main.route('/questions/export', methods=['GET'])
+@jwt_required_middleware(role="admin")
+def export_questions_route():
+    export_format = export_format_arg()
+    if not export_format:
+        return jsonify({
+            "code": "400",
+            "message": "El formato debe ser 'json' o 'ndjson'"
+        }), 400
+
+    def serialize(q):
+        return {
+            "id": q.id,
+            "question_text": q.question_text,
+            "options": {
+                "option_1": q.option_1,
+                "option_2": q.option_2,
+                "option_3": q.option_3
+            },
+            "correct_option": q.correct_option,
+            "difficulty": q.difficulty
+        }
+
+    return export_response(iter_questions(), serialize, export_format, "Preguntas exportadas exitosamente")
+
+
 # Endpoint para actualizar una pregunta
 @main.route('/questions/<int:question_id>', methods=['PUT'])
 @jwt_required_middleware(role="admin")
@@ -369,37 +575,38 @@ def create_trivia_route():
             "message": "Faltan datos necesarios",  
         }), 400
 
-    # Obtener las preguntas de la base de datos mediante los IDs proporcionados
-    question_ids = data.get('question_ids', [])
-    valid_questions = []
-    for question_id in question_ids:
-        question = Question.query.get(question_id)
-        if question:
-            valid_questions.append(question)
-        else:
-            return jsonify({
-                "code": "400",
-                "message": f"La pregunta con ID {question_id} no existe"
-            }), 400
+    question_ids = normalize_ids(question_ids)
+    user_ids = normalize_ids(user_ids)
+    if question_ids is None or user_ids is None:
+        return jsonify({
+            "code": "400",
+            "message": "Los IDs de preguntas y usuarios deben ser números enteros"
+        }), 400
 
-    # Obtener los usuarios de la base de datos mediante los IDs proporcionados
-    valid_users = []
-    for user_id in user_ids:
-        user = User.query.get(user_id)
-        if user:
-            valid_users.append(user)
-        else:
-            return jsonify({
-                "code": "400",
-                "message": f"El usuario con ID {user_id} no existe"
-            }), 400
+    # Validar las preguntas con consultas IN en lugar de una consulta por ID
+    existing_questions = get_existing_question_ids(question_ids)
+    missing = next((i for i in question_ids if i not in existing_questions), None)
+    if missing is not None:
+        return jsonify({
+            "code": "400",
+            "message": f"La pregunta con ID {missing} no existe"
+        }), 400
+
+    # Validar los usuarios y obtener sus nombres para la respuesta
+    user_names = get_user_names(user_ids)
+    missing = next((i for i in user_ids if i not in user_names), None)
+    if missing is not None:
+        return jsonify({
+            "code": "400",
+            "message": f"El usuario con ID {missing} no existe"
+        }), 400
 
     try:
         trivia = create_trivia(
                     data['name'], 
                     data['description'], 
-                    data['user_ids'], 
-                    data['question_ids']
+                    user_ids, 
+                    question_ids
                 )
 
         return jsonify({
@@ -409,8 +616,8 @@ def create_trivia_route():
                 "id": trivia.id,
                 "name": trivia.name,
                 "description": trivia.description,
-                "questions": [q.id for q in valid_questions],
-                "users": [{"id": user.id, "name": user.name} for user in valid_users]
+                "questions": question_ids,
+                "users": [{"id": user_id, "name": user_names[user_id]} for user_id in user_ids]
             }
         }), 201
 
@@ -436,16 +643,23 @@ def create_trivia_route():
 # Endpoint obtener todas las trivias
 @main.route('/trivias', methods=['GET'])
 @jwt_required_middleware()
+@cached_response(lambda: (versions.TRIVIAS, versions.QUESTIONS, versions.USERS))
 def get_all_trivias():
-    # Obtener todas las trivias de la base de datos
-    trivias = get_trivias()
+    try:
+        limit, after = page_args(request.args)
+    except InvalidPageRequest as e:
+        return invalid_page_response(e)
+
+    # Obtener una página de trivias de la base de datos
+    page = get_trivias(limit, after)
+    trivias = page.items
 
     # Obtener el usuario autenticado desde el token
     current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    current_user = identity_cache.lookup(current_user_id)
 
     # Verificar que el usuario exista (opcional, según requisitos)
-    if not current_user:
+    if not current_user.exists:
         return jsonify({
             "code": "401",
             "message": "La sesión ha caducado, por favor inicia sesión nuevamente."
@@ -453,7 +667,7 @@ def get_all_trivias():
     
 
     # Si no se encuentran trivias, devolver un error 404
-    if not trivias:
+    if not trivias and not after:
         return jsonify({"code": "404", "message": "No se han encontrado trivias", "data": []}), 404
 
     # Crear una lista de las trivias con su nombre, descripción y preguntas
@@ -472,16 +686,18 @@ def get_all_trivias():
         "code": "200",
         "length": len(trivias_data),
         "message": "Trivias obtenidas exitosamente",
-        "data": trivias_data
+        "data": trivias_data,
+        "next_cursor": page.next_cursor
     }), 200
 
 
 # Endpoint para obtener una trivia por su id
 @main.route('/trivias/<int:trivia_id>', methods=['GET'])
 @jwt_required_middleware()
+@cached_response(lambda trivia_id: (versions.trivia(trivia_id), versions.QUESTIONS, versions.USERS))
 def get_trivia_by_id(trivia_id):
     # Obtener la trivia por ID
-    trivia = Trivia.query.get(trivia_id)
+    trivia = get_trivia(trivia_id)
     if not trivia:
         return jsonify({
             "code": "404",
@@ -510,6 +726,12 @@ def get_trivia_by_id(trivia_id):
 def update_trivia_route(trivia_id):
     data = request.get_json()
 
+    if isinstance(data, dict) and any(data.get(key) and normalize_ids(data[key]) is None for key in ('question_ids', 'user_ids')):
+        return jsonify({
+            "code": "400",
+            "message": "Los IDs de preguntas y usuarios deben ser números enteros"
+        }), 400
+
     try:
         updated_trivia = update_trivia(trivia_id, data)
 
@@ -564,7 +786,12 @@ def delete_trivia_route(trivia_id):
 # Endpoint para obtener las trivias de un usuario por su user_id
 @main.route('/users/<int:user_id>/trivias', methods=['GET'])
 @jwt_required_middleware()
+@cached_response(lambda user_id: (versions.TRIVIAS, versions.QUESTIONS, versions.USERS))
 def get_user_trivias(user_id):
+    try:
+        limit, after = page_args(request.args)
+    except InvalidPageRequest as e:
+        return invalid_page_response(e)
 
     user = User.query.get(user_id)
     
@@ -574,11 +801,12 @@ def get_user_trivias(user_id):
             "message": "Usuario no encontrado"
         }), 404
 
-    # Obtener las trivias asociadas a este usuario
-    trivias = user.trivias  # Esto es posible gracias a la relación definida en el modelo User
+    # Obtener una página de las trivias asociadas a este usuario
+    page = get_trivias_by_user(user_id, limit, after)
+    trivias = page.items
     
     # Si no tiene trivias asignadas
-    if not trivias:
+    if not trivias and not after:
         return jsonify({
             "code": "404",
             "message": "Este usuario no tiene trivias asignadas"
@@ -601,6 +829,7 @@ def get_user_trivias(user_id):
         "message": f"Trivias de {user.name} obtenidas exitosamente",
         "data": trivias_data,
         "len": len(trivias_data),
+        "next_cursor": page.next_cursor,
         "user": {
             "id": user.id,
             "user_name": user.name
@@ -654,104 +883,69 @@ def participate(trivia_id):
             "message": "Las respuestas no pueden estar vacías"
         }), 400
 
-    # Verificar que la trivia existe
-    trivia = Trivia.query.get(trivia_id)
-    if not trivia:
+    # Verificar que la trivia existe (clave de respuestas precompilada y en caché)
+    answer_key = get_answer_key(trivia_id)
+    if not answer_key:
         return jsonify({
             "code": "404",
             "message": "Trivia no encontrada"
         }), 404
-    
-    # Obtener los IDs de las preguntas asociadas a la trivia
-    trivia_question_ids = {question.id for question in trivia.questions}
 
     # Validar que los IDs de las respuestas del usuario estén dentro de los IDs de las preguntas de la trivia
-    invalid_question_ids = set(answers.keys()).difference(trivia_question_ids)
+    invalid_question_ids = set(answers.keys()).difference(answer_key.question_ids)
     
-    if not invalid_question_ids:
+    if invalid_question_ids:
         return jsonify({
             "code": "400",
             "message": f"Alguna(s) pregunta(s) no pertenece(n) a esta trivia: {list(invalid_question_ids)}"
         }), 400
     
     # Verificar que "answers" tenga la cantidad de respuestas solicitadas
-    if len(answers) != len(trivia.questions):
+    if len(answers) != len(answer_key.question_ids):
         return jsonify({
             "code": "400",
             "message": "Debes ingresar todas las respuestas solicitadas."
         }), 404
 
     # Validar respuestas y calcular el puntaje
-    score = 0
-    correct_answers = {}
-
-    for question in trivia.questions:
-        correct_option = question.correct_option
-        user_answer = answers.get(str(question.id))
-
-        # Acceder a las opciones de la pregunta (deberías tener 'option_1', 'option_2', 'option_3' en tu modelo)
-        options = {
-            "option_1": question.option_1,
-            "option_2": question.option_2,
-            "option_3": question.option_3
-        }
+    score, correct_answers = grade(answer_key, answers)
 
-        # Obtener el valor de la opción seleccionada por el usuario
-        option_value = options.get(user_answer)
-
-        is_correct = option_value == correct_option
-
-        # Validar si la respuesta del usuario es correcta
-        if is_correct:
-            difficulty = question.difficulty  
-            if difficulty == "fácil":  
-                score += 1  
-            elif difficulty == "medio": 
-                score += 2
-            elif difficulty == "difícil":  
-                score += 3  
-            else:
-                score += 0
-
-        # Guardar la respuesta correcta para la pregunta
-        correct_answers[question.id] = {
-            "correct_answer": correct_option,
-            "difficulty": question.difficulty,
-            "is_correct": "correcta" if is_correct else "incorrecta"
-        }
-
-    try:    
-        # Guardar participación
-        participation = create_participation(
-                        data['user_name'], 
-                        data['trivia_id'], 
-                        data['answers'], 
-                        score
-                    )
-
-        # Guardar en el ranking
-        ranking = create_ranking(
-                        data['trivia_id'], 
-                        user.id, 
-                        score
-                    )
+    try:
+        if write_behind_enabled():
+            # Escritura diferida: se responde sin esperar el commit (202)
+            enqueue_submission(user.id, data['user_name'], data['trivia_id'], data['answers'], score)
+            code, message = 202, "Participación recibida"
+        else:
+            # Guardar participación y ranking en una sola transacción
+            ranking_id = create_submission(
+                            user.id,
+                            data['user_name'], 
+                            data['trivia_id'], 
+                            data['answers'], 
+                            score
+                        )
+            leaderboard.record(trivia_id, ranking_id, user.id, user.name, score)
+            code, message = 201, "Participación registrada"
 
         # Responder con el puntaje y las respuestas correctas
         return jsonify({
-            "code": "201",
-            "message": "Participación registrada",
+            "code": str(code),
+            "message": message,
             "data": {
-                "score": ranking.score,
+                "score": score,
                 "correct_answers": correct_answers,  
                 "trivia": {
-                    "id": trivia.id,
-                    "name": trivia.name
+                    "id": answer_key.trivia_id,
+                    "name": answer_key.name
                 },
                 "user": {
-                    "name": participation.user_name
+                    "name": data['user_name']
                 }
             }
-        }), 201
+        }), code
+
+    except QueueFull:
+        return server_busy_response()
     
     except IntegrityError as e:
         return jsonify({
@@ -772,10 +966,133 @@ def participate(trivia_id):
         }), 500
 
 
+# Máximo de participaciones por request en /participate/batch
+MAX_BATCH_SUBMISSIONS = 1000
+
+
+# Validar una participación del lote; devuelve (código, mensaje) o None
+def submission_error(submission, user_ids, answer_key):
+    if not isinstance(submission, dict):
+        return "400", "Faltan datos necesarios"
+
+    if not submission.get('user_name') or not submission.get('answers') or not submission.get('trivia_id'):
+        return "400", "Faltan datos necesarios"
+
+    if submission['user_name'] not in user_ids:
+        return "404", "Usuario no encontrado"
+
+    answers = submission['answers']
+    if not isinstance(answers, dict):
+        return "400", "Las respuestas no pueden estar vacías"
+
+    if not answer_key:
+        return "404", "Trivia no encontrada"
+
+    invalid_question_ids = set(answers.keys()).difference(answer_key.question_ids)
+    if invalid_question_ids:
+        return "400", f"Alguna(s) pregunta(s) no pertenece(n) a esta trivia: {list(invalid_question_ids)}"
+
+    if len(answers) != len(answer_key.question_ids):
+        return "400", "Debes ingresar todas las respuestas solicitadas."
+    return None
+
+
+# Endpoint para registrar muchas participaciones en un solo request (kioscos sin conexión)
+@main.route('/participate/batch', methods=['POST'])
+@jwt_required_middleware()
+def participate_batch():
+    data = request.get_json()
+    submissions = data.get('submissions') if isinstance(data, dict) else data
+
+    if not isinstance(submissions, list) or not submissions:
+        return jsonify({
+            "code": "400",
+            "message": "Se esperaba una lista de participaciones en 'submissions'"
+        }), 400
+
+    if len(submissions) > MAX_BATCH_SUBMISSIONS:
+        return jsonify({
+            "code": "400",
+            "message": f"Se permiten como máximo {MAX_BATCH_SUBMISSIONS} participaciones por solicitud"
+        }), 400
+
+    # Resolver usuarios y claves de respuestas una sola vez para todo el lote
+    names = [s.get('user_name') for s in submissions if isinstance(s, dict) and isinstance(s.get('user_name'), str)]
+    user_ids = get_user_ids_by_name(names)
+    answer_keys = {}
+
+    results = []
+    entries = []
+    for index, submission in enumerate(submissions):
+        trivia_id = submission.get('trivia_id') if isinstance(submission, dict) else None
+        if not isinstance(trivia_id, int) or isinstance(trivia_id, bool):
+            trivia_id = None
+        elif trivia_id not in answer_keys:
+            answer_keys[trivia_id] = get_answer_key(trivia_id)
+
+        error = submission_error(submission, user_ids, answer_keys.get(trivia_id))
+        if error:
+            results.append({"index": index, "code": error[0], "message": error[1]})
+            continue
+
+        score, correct_answers = grade(answer_keys[trivia_id], submission['answers'])
+        entries.append({
+            "user_id": user_ids[submission['user_name']],
+            "user_name": submission['user_name'],
+            "trivia_id": trivia_id,
+            "answers": submission['answers'],
+            "score": score
+        })
+        results.append({
+            "index": index,
+            "code": "201",
+            "message": "Participación registrada",
+            "score": score,
+            "correct_answers": correct_answers
+        })
+
+    try:
+        # Todas las participaciones válidas en una sola transacción
+        create_participations(entries)
+
+    except IntegrityError:
+        return jsonify({
+            "code": "400",
+            "message": "Error de integridad al registrar las participaciones; no se guardó ninguna."
+        }), 400
+
+    except StatementError as e:
+        # La base de datos siguió bloqueada después de los reintentos
+        if is_locked_error(e):
+            return server_busy_response()
+        return jsonify({
+            "code": "500",
+            "message": "Error al registrar las participaciones; no se guardó ninguna."
+        }), 500
+
+    return jsonify({
+        "code": "200",
+        "message": f"Se registraron {len(entries)} de {len(submissions)} participaciones",
+        "data": {
+            "registered": len(entries),
+            "failed": len(submissions) - len(entries),
+            "results": results
+        }
+    }), 200
+
+
 # Endpoint para obtener el ranking de una trivia por su trivia_id
 @main.route('/ranking/<int:trivia_id>', methods=['GET'])
 @jwt_required_middleware()
+@cached_response(lambda trivia_id: (versions.trivia(trivia_id), versions.ranking(trivia_id), versions.USERS))
 def ranking(trivia_id):
+    try:
+        limit, after = page_args(request.args, key_size=2)
+        if after and not all(isinstance(value, int) for value in after):
+            raise InvalidPageRequest("Cursor inválido")
+    except InvalidPageRequest as e:
+        return invalid_page_response(e)
+
     # Obtener la trivia por ID
     trivia = Trivia.query.get(trivia_id)
     if not trivia:
@@ -784,10 +1101,11 @@ def ranking(trivia_id):
             "message": "Trivia no encontrada"
         }), 404
 
-    # Obtener los rankings ordenados por puntaje de mayor a menor
-    rankings = Ranking.query.filter_by(trivia_id=trivia_id).order_by(Ranking.score.desc()).all()
+    # Obtener una página del leaderboard ordenada por puntaje de mayor a menor
+    board = leaderboard.get_leaderboard(trivia_id)
+    rankings, next_key = board.page(limit, after)
 
-    if not rankings:
+    if not rankings and not after:
         return jsonify({
             "code": "404",
             "message": "No hay participantes para esta trivia"
@@ -797,8 +1115,9 @@ def ranking(trivia_id):
     ranking_list = [
         {
             #"user_id": ranking.user_id,
-            "user_name": ranking.user.name,
-            "score": ranking.score
+            "user_name": ranking.user_name,
+            "score": ranking.score,
+            "rank": board.rank(ranking.score)
         }
         for ranking in rankings
     ]
@@ -814,8 +1133,94 @@ def ranking(trivia_id):
                 "descripcion": trivia.description
             },
             "ranking": ranking_list
+        },
+        "next_cursor": encode_cursor(next_key) if next_key else None
+    }), 200
+
+
+# Endpoint para obtener la posición de un usuario en el ranking y sus vecinos
+@main.route('/ranking/<int:trivia_id>/users/<int:user_id>', methods=['GET'])
+@jwt_required_middleware()
+def ranking_position(trivia_id, user_id):
+    try:
+        radius = int(request.args.get('radius', 2))
+    except ValueError:
+        radius = -1
+
+    if radius < 0 or radius > 50:
+        return jsonify({
+            "code": "400",
+            "message": "El parámetro radius debe estar entre 0 y 50"
+        }), 400
+
+    if not Trivia.query.get(trivia_id):
+        return jsonify({
+            "code": "404",
+            "message": "Trivia no encontrada"
+        }), 404
+
+    board = leaderboard.get_leaderboard(trivia_id)
+    position = board.around(user_id, radius)
+
+    if not position:
+        return jsonify({
+            "code": "404",
+            "message": "El usuario no participa en esta trivia"
+        }), 404
+
+    def serialize(entry):
+        return {"user_name": entry.user_name, "score": entry.score, "rank": board.rank(entry.score)}
+
+    return jsonify({
+        "code": "200",
+        "message": "Posición recuperada exitosamente",
+        "data": {
+            "user_name": position["entry"].user_name,
+            "score": position["entry"].score,
+            "rank": position["rank"],
+            "dense_rank": position["dense_rank"],
+            "above": [serialize(entry) for entry in position["above"]],
+            "below": [serialize(entry) for entry in position["below"]]
         }
     }), 200
 
 
+# Endpoint para exportar el ranking completo de una trivia en streaming (JSON o NDJSON)
+@main.route('/ranking/<int:trivia_id>/export', methods=['GET'])
+@jwt_required_middleware(role="admin")
+def export_ranking(trivia_id):
+    export_format = export_format_arg()
+    if not export_format:
+        return jsonify({
+            "code": "400",
+            "message": "El formato debe ser 'json' o 'ndjson'"
+        }), 400
+
+    if not Trivia.query.get(trivia_id):
+        return jsonify({
+            "code": "404",
+            "message": "Trivia no encontrada"
+        }), 404
+
+    def serialize(row):
+        return {"user_name": row.user_name, "score": row.score}
+
+    return export_response(iter_ranking(trivia_id), serialize, export_format, "Ranking exportado exitosamente")
+
 
+# Endpoint con el estado de las cachés y colas internas del proceso
+@main.route('/status', methods=['GET'])
+@jwt_required_middleware(role="admin")
+def status():
+    return jsonify({
+        "code": "200",
+        "message": "Estado recuperado exitosamente",
+        "data": {
+            "pid": os.getpid(),
+            "identity_cache": identity_cache.stats(),
+            "response_cache": response_cache.stats(),
+            "password_hashing": security_stats(),
+            "group_commit": group_commit_stats(),
+            "write_behind": write_behind_stats()
+        }
+    }), 200
@@ -0,0 +1,19 @@
+from sqlalchemy import inspect
+from .database import db
+
+# Índices secundarios de las columnas más consultadas.
+# db.create_all() solo crea índices junto con tablas nuevas; ensure_indexes los
+# agrega también a bases de datos existentes (por ejemplo un trivia.db antiguo).
+
+
+# Crear los índices definidos en los modelos que falten en la base de datos
+def ensure_indexes(engine):
+    inspector = inspect(engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
@@ -0,0 +1,180 @@
+import re
+import weakref
+from sqlalchemy import text
+from .database import db
+from .pagination import DEFAULT_PAGE_SIZE, Page
+
+# Búsqueda de texto completo sobre el banco de preguntas.
+# En SQLite usa la tabla virtual FTS5 question_fts (migración 3), con el texto de la
+# pregunta y sus tres opciones. Es una tabla de contenido externo: guarda solo el
+# índice y lee el texto de la tabla question. Los triggers de question la mantienen
+# sincronizada en cualquier INSERT, UPDATE o DELETE (ORM, bulk o SQL directo). El
+# tokenizador ignora mayúsculas y tildes ("geografia" encuentra "Geografía").
+# Los resultados se ordenan por bm25 (el texto de la pregunta pesa más que las
+# opciones) y se paginan por cursor sobre (puntaje, id).
+# En otras bases de datos, o en SQLite sin la migración 3, se busca con LIKE sobre las
+# mismas columnas, ordenado por id. Si existe la tabla FTS se comprueba una vez por engine.
+
+FTS_TABLE = "question_fts"
+FTS_COLUMNS = ("question_text", "option_1", "option_2", "option_3")
+BM25_WEIGHTS = (10.0, 1.0, 1.0, 1.0)
+MAX_TERMS = 16
+
+_TRIGGERS = {
+    "question_fts_ai": """
+        CREATE TRIGGER IF NOT EXISTS question_fts_ai AFTER INSERT ON question BEGIN
+            INSERT INTO question_fts (rowid, question_text, option_1, option_2, option_3)
+            VALUES (new.id, new.question_text, new.option_1, new.option_2, new.option_3);
+        END""",
+    "question_fts_ad": """
+        CREATE TRIGGER IF NOT EXISTS question_fts_ad AFTER DELETE ON question BEGIN
+            INSERT INTO question_fts (question_fts, rowid, question_text, option_1, option_2, option_3)
+            VALUES ('delete', old.id, old.question_text, old.option_1, old.option_2, old.option_3);
+        END""",
+    "question_fts_au": """
+        CREATE TRIGGER IF NOT EXISTS question_fts_au AFTER UPDATE OF question_text, option_1, option_2, option_3 ON question BEGIN
+            INSERT INTO question_fts (question_fts, rowid, question_text, option_1, option_2, option_3)
+            VALUES ('delete', old.id, old.question_text, old.option_1, old.option_2, old.option_3);
+            INSERT INTO question_fts (rowid, question_text, option_1, option_2, option_3)
+            VALUES (new.id, new.question_text, new.option_1, new.option_2, new.option_3);
+        END""",
+}
+
+
+# engine -> si tiene la tabla question_fts
+_fts_available = weakref.WeakKeyDictionary()
+
+
+class InvalidSearch(ValueError):
+    pass
+
+
+def is_supported(connection):
+    return connection.dialect.name == "sqlite"
+
+
+# Crear la tabla FTS5, sus triggers y cargar las preguntas existentes (migración 3)
+def create_index(connection):
+    if not is_supported(connection):
+        return
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{', '.join(FTS_COLUMNS)}, content='question', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    create_triggers(connection)
+    rebuild(connection)
+    _fts_available.pop(connection.engine, None)
+
+
+def create_triggers(connection):
+    for sql in _TRIGGERS.values():
+        connection.exec_driver_sql(sql)
+
+
+# Quitar los triggers (cargas masivas que luego llaman a rebuild)
+def drop_triggers(connection):
+    for name in _TRIGGERS:
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+
+
+# Quitar la tabla FTS5 y sus triggers
+def drop_index(connection):
+    if not is_supported(connection):
+        return
+    drop_triggers(connection)
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    _fts_available.pop(connection.engine, None)
+
+
+def has_index(connection):
+    return is_supported(connection) and connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).first() is not None
+
+
+# has_index con el resultado guardado por engine
+def _use_fts(connection):
+    available = _fts_available.get(connection.engine)
+    if available is None:
+        available = _fts_available[connection.engine] = has_index(connection)
+    return available
+
+
+# Reconstruir el índice completo desde la tabla question
+def rebuild(connection):
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+# Palabras del texto buscado (la puntuación y los operadores se descartan)
+def search_terms(q):
+    terms = re.findall(r"\w+", q or "")[:MAX_TERMS]
+    if not terms:
+        raise InvalidSearch("El parámetro q debe incluir al menos una palabra")
+    return terms
+
+
+# Consulta FTS5: cada palabra entre comillas (sin sintaxis de FTS5) y la última como
+# prefijo, para encontrar resultados mientras se escribe
+def match_query(terms):
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+# Página de resultados: filas (id, question_text, option_1, option_2, option_3,
+# correct_option, difficulty, score); after es la clave [score, id] de la página anterior
+def search_questions(q, difficulty=None, limit=DEFAULT_PAGE_SIZE, after=None):
+    terms = search_terms(q)
+    if _use_fts(db.session.connection()):
+        rows = _fts_search(match_query(terms), difficulty, limit + 1, after)
+    else:
+        rows = _like_search(terms, difficulty, limit + 1, after)
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return Page(rows, [rows[-1].score, rows[-1].id])
+    return Page(rows)
+
+
+def _fts_search(match, difficulty, limit, after):
+    score = f"bm25({FTS_TABLE}, {', '.join(str(weight) for weight in BM25_WEIGHTS)})"
+    conditions = [f"{FTS_TABLE} MATCH :match"]
+    params = {"match": match, "limit": limit}
+    if difficulty:
+        conditions.append("q.difficulty = :difficulty")
+        params["difficulty"] = difficulty
+    if after is not None:
+        conditions.append(f"({score} > :after_score OR ({score} = :after_score AND q.id > :after_id))")
+        params.update(after_score=after[0], after_id=after[1])
+
+    statement = text(
+        f"SELECT q.id, q.question_text, q.option_1, q.option_2, q.option_3, q.correct_option, "
+        f"q.difficulty, {score} AS score "
+        f"FROM {FTS_TABLE} JOIN question AS q ON q.id = {FTS_TABLE}.rowid "
+        f"WHERE {' AND '.join(conditions)} "
+        f"ORDER BY score, q.id LIMIT :limit"
+    )
+    return db.session.execute(statement, params).all()
+
+
+def _like_search(terms, difficulty, limit, after):
+    conditions = []
+    params = {"limit": limit}
+    for i, term in enumerate(terms):
+        columns = " OR ".join(f"LOWER(q.{column}) LIKE :term_{i}" for column in FTS_COLUMNS)
+        conditions.append(f"({columns})")
+        params[f"term_{i}"] = f"%{term.lower()}%"
+    if difficulty:
+        conditions.append("q.difficulty = :difficulty")
+        params["difficulty"] = difficulty
+    if after is not None:
+        conditions.append("q.id > :after_id")
+        params["after_id"] = after[1]
+
+    statement = text(
+        "SELECT q.id, q.question_text, q.option_1, q.option_2, q.option_3, q.correct_option, "
+        "q.difficulty, 0.0 AS score "
+        f"FROM question AS q WHERE {' AND '.join(conditions)} ORDER BY q.id LIMIT :limit"
+    )
+    return db.session.execute(statement, params).all()
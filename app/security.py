@@ -0,0 +1,122 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+from . import metrics
+
+# Hash de contraseñas fuera del hilo del request.
+# generate_password_hash / check_password_hash son CPU intensivos; se ejecutan en un
+# pool de procesos acotado para que una ráfaga de logins no bloquee al worker. Si la
+# cola supera el límite configurado, o si el hash no termina dentro del tiempo
+# configurado, se rechaza la operación (HashingBusy -> 503).
+# Con workers = 0 el hash se calcula en el mismo hilo (útil en pruebas).
+
+DEFAULT_METHOD = f"pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}"
+DEFAULT_TIMEOUT = 30
+
+
+class HashingBusy(Exception):
+    pass
+
+
+_settings = {
+    "method": DEFAULT_METHOD,
+    "workers": 0,
+    "queue_limit": 0,
+    "timeout": DEFAULT_TIMEOUT,
+}
+_executor = None
+_executor_pid = None
+_slots = None
+_lock = threading.Lock()
+
+
+# Configurar método, cantidad de procesos y largo máximo de la cola
+def configure(method=DEFAULT_METHOD, workers=0, queue_limit=None, timeout=DEFAULT_TIMEOUT):
+    global _slots
+
+    if queue_limit is None:
+        queue_limit = max(workers, 1) * 4
+
+    # "pbkdf2:sha256" se guarda como "pbkdf2:sha256:<iteraciones>"
+    if method.startswith("pbkdf2:") and method.count(":") == 1:
+        method = f"{method}:{DEFAULT_PBKDF2_ITERATIONS}"
+
+    with _lock:
+        if workers != _settings["workers"]:
+            _shutdown_executor()
+        _settings.update(method=method, workers=workers, queue_limit=queue_limit, timeout=timeout)
+        _slots = threading.BoundedSemaphore(queue_limit)
+
+
+def _shutdown_executor():
+    global _executor, _executor_pid
+    if _executor is not None and _executor_pid == os.getpid():
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _executor_pid = None
+
+
+# El pool se crea al primer uso y de nuevo en cada proceso hijo (después de un fork)
+def _get_executor():
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(max_workers=_settings["workers"])
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _run(fn, *args):
+    if not _settings["workers"]:
+        return fn(*args)
+
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        metrics.hash_rejected()
+        raise HashingBusy("Demasiadas operaciones de hash en cola")
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+
+    # El lugar en la cola se libera cuando la operación termina (o se cancela antes de
+    # empezar), no cuando se deja de esperarla: un hash que sigue corriendo después del
+    # tiempo de espera todavía ocupa un proceso del pool
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=_settings["timeout"])
+    except FutureTimeout:
+        future.cancel()
+        metrics.hash_rejected()
+        raise HashingBusy("La operación de hash superó el tiempo de espera")
+
+
+# Generar el hash de una contraseña con el método configurado
+def hash_password(password):
+    with metrics.hash_timer("hash"):
+        return _run(generate_password_hash, password, _settings["method"])
+
+
+# Verificar una contraseña contra su hash
+def verify_password(password_hash, password):
+    with metrics.hash_timer("verify"):
+        return _run(check_password_hash, password_hash, password)
+
+
+# El hash fue generado con un método o costo distinto al configurado
+def needs_rehash(password_hash):
+    return password_hash.split('$', 1)[0] != _settings["method"]
+
+
+def stats():
+    return {
+        "method": _settings["method"],
+        "workers": _settings["workers"],
+        "queue_limit": _settings["queue_limit"],
+    }
+
+
+atexit.register(_shutdown_executor)
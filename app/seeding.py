@@ -0,0 +1,270 @@
+import math
+import random
+from array import array
+from bisect import bisect
+from itertools import islice
+from sqlalchemy import text
+from werkzeug.security import generate_password_hash
+from .models import User, Question, Trivia, Participate, Ranking, trivia_questions, trivia_users
+from .answer_keys import DIFFICULTY_POINTS, OPTION_KEYS
+from . import versions
+from . import search
+
+# Datos sintéticos para pruebas de carga y de escala.
+# Genera usuarios, preguntas (fácil/medio/difícil), trivias con una cantidad variable
+# de preguntas y usuarios asignados, y participaciones con su fila de ranking. Los
+# datos son deterministas: la misma semilla y las mismas cantidades producen la misma
+# base de datos.
+#
+# - La popularidad de las trivias y la actividad de los usuarios siguen una ley de
+#   Zipf: pocas trivias y pocos usuarios concentran la mayoría de las participaciones.
+# - Cada usuario tiene una habilidad (distribución beta(1, 2), cargada hacia valores bajos)
+#   y cada respuesta es correcta con una probabilidad que depende de esa habilidad y
+#   de la dificultad de la pregunta; el puntaje se calcula como en answer_keys.grade.
+# - Las filas se insertan con executemany del driver (tuplas, sin el ORM) en lotes,
+#   todo en una sola transacción. En SQLite los índices secundarios y el índice de
+#   búsqueda de preguntas (sin sus triggers) se construyen al final, y se desactiva la
+#   espera del fsync durante la carga.
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+# Cambia cuando el generador produce datos distintos para la misma semilla
+GENERATOR_VERSION = 1
+
+DEFAULT_PASSWORD = "seedpassword"
+EMAIL_DOMAIN = "seed.local"
+DEFAULT_BATCH_SIZE = 20_000
+
+DIFFICULTIES = tuple(DIFFICULTY_POINTS)  # fácil, medio, difícil
+DIFFICULTY_WEIGHTS = (0.45, 0.35, 0.20)
+DIFFICULTY_FACTOR = {"fácil": 1.3, "medio": 1.0, "difícil": 0.6}  # multiplica la habilidad
+TOPICS = (
+    "historia", "geografía", "ciencia", "deporte", "música", "cine", "literatura",
+    "arte", "tecnología", "naturaleza", "astronomía", "gastronomía"
+)
+WORDS = (
+    "capital", "autor", "año", "récord", "descubrimiento", "origen", "premio", "río",
+    "montaña", "instrumento", "película", "planeta", "invento", "batalla", "plato"
+)
+
+QUESTIONS_PER_TRIVIA = (5, 20)   # mínimo y máximo por trivia
+USERS_PER_TRIVIA = (5, 40)
+TRIVIA_POPULARITY_EXPONENT = 1.1
+USER_ACTIVITY_EXPONENT = 0.8
+PARTICIPATE_COLUMNS = ("id", "user_name", "trivia_id", "answers", "score")
+RANKING_COLUMNS = ("id", "trivia_id", "user_id", "score")
+SEEDED_TABLES = (User.__table__, Question.__table__, Trivia.__table__, Participate.__table__, Ranking.__table__)
+
+
+class SeedError(Exception):
+    pass
+
+
+# Cantidades para una escala de `rows` filas (la usada por los benchmarks)
+def plan_for_rows(rows):
+    return {
+        "users": rows,
+        "questions": rows,
+        "trivias": max(rows // 100, 10),
+        "participations": rows,
+    }
+
+
+def user_email(user_id):
+    return f"user{user_id}@{EMAIL_DOMAIN}"
+
+
+def _cum_zipf(n, exponent):
+    total = 0.0
+    cumulative = []
+    for rank in range(1, n + 1):
+        total += rank ** -exponent
+        cumulative.append(total)
+    return cumulative
+
+
+# Paso coprimo con n: rank -> id recorre todos los ids sin agrupar a los más activos
+def _stride(n):
+    step = max(1, int(n * 0.618))
+    while math.gcd(step, n) != 1:
+        step += 1
+    return step
+
+
+# INSERT de la tabla para executemany del driver (None si el driver no usa ? ni %s)
+def _insert_sql(connection, table, columns):
+    placeholder = {"qmark": "?", "format": "%s", "pyformat": "%s"}.get(connection.dialect.paramstyle)
+    if placeholder is None:
+        return None
+    preparer = connection.dialect.identifier_preparer
+    return "INSERT INTO {} ({}) VALUES ({})".format(
+        preparer.format_table(table),
+        ", ".join(preparer.quote(column) for column in columns),
+        ", ".join([placeholder] * len(columns))
+    )
+
+
+# Insertar las filas (tuplas) en lotes de batch_size; devuelve la cantidad insertada
+def _insert(connection, table, columns, rows, batch_size):
+    sql = _insert_sql(connection, table, columns)
+    count = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return count
+        if sql is not None:
+            connection.exec_driver_sql(sql, batch)
+        else:
+            connection.execute(table.insert(), [dict(zip(columns, row)) for row in batch])
+        count += len(batch)
+
+
+def _is_empty(connection):
+    return connection.execute(text(f"SELECT COUNT(*) FROM {connection.dialect.identifier_preparer.format_table(User.__table__)}")).scalar() == 0
+
+
+# Poblar una base de datos vacía (con el esquema ya migrado); devuelve las filas insertadas por tabla
+def seed(engine, users, questions, trivias, participations, seed=42, password=DEFAULT_PASSWORD,
+         password_method="pbkdf2:sha256:1000", batch_size=DEFAULT_BATCH_SIZE):
+    if min(users, questions, trivias) < 1 or participations < 0:
+        raise SeedError("Se necesita al menos un usuario, una pregunta y una trivia")
+
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(password, password_method)
+    sqlite = engine.dialect.name == "sqlite"
+    deferred_indexes = [index for table in SEEDED_TABLES for index in table.indexes] if sqlite else []
+
+    with engine.connect() as connection:
+        if not _is_empty(connection):
+            raise SeedError("La base de datos ya tiene usuarios; la siembra requiere una base vacía")
+
+        if sqlite:
+            synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+            connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        try:
+            with connection.begin():
+                question_search = search.has_index(connection)
+                if question_search:
+                    search.drop_triggers(connection)
+                for index in deferred_indexes:
+                    index.drop(connection)
+                counts = _seed(connection, rng, users, questions, trivias, participations, password_hash, batch_size)
+                for index in deferred_indexes:
+                    index.create(connection)
+                if question_search:
+                    search.rebuild(connection)
+                    search.create_triggers(connection)
+                versions.bump(versions.USERS, versions.QUESTIONS, versions.TRIVIAS, connection=connection)
+        finally:
+            if sqlite:
+                connection.exec_driver_sql(f"PRAGMA synchronous = {synchronous}")
+
+    return counts
+
+
+def _seed(connection, rng, users, questions, trivias, participations, password_hash, batch_size):
+    counts = {}
+    random_value = rng.random
+
+    def insert(name, table, columns, rows):
+        counts[name] = _insert(connection, table, columns, rows, batch_size)
+
+    # Usuarios (el 1 es administrador)
+    insert("users", User.__table__, ("id", "name", "email", "password", "role"), (
+        (user_id, f"user{user_id}", user_email(user_id), password_hash, "admin" if user_id == 1 else "jugador")
+        for user_id in range(1, users + 1)
+    ))
+
+    # Preguntas: se guarda la dificultad y la opción correcta de cada una para corregir las participaciones
+    difficulty_of = bytearray(questions + 1)
+    correct_of = bytearray(questions + 1)
+    cum_difficulty = list(_cumulative(DIFFICULTY_WEIGHTS))
+
+    def question_rows():
+        for question_id in range(1, questions + 1):
+            topic = TOPICS[int(random_value() * len(TOPICS))]
+            word = WORDS[int(random_value() * len(WORDS))]
+            level = min(bisect(cum_difficulty, random_value()), len(DIFFICULTIES) - 1)
+            correct = int(random_value() * 3)
+            options = (f"{topic} {question_id}-A", f"{topic} {question_id}-B", f"{topic} {question_id}-C")
+            difficulty_of[question_id] = level
+            correct_of[question_id] = correct
+            yield (question_id, f"¿Cuál es el {word} de {topic} número {question_id}?",
+                   options[correct], *options, DIFFICULTIES[level])
+
+    insert("questions", Question.__table__, (
+        "id", "question_text", "correct_option", "option_1", "option_2", "option_3", "difficulty"
+    ), question_rows())
+
+    # Trivias con una cantidad variable de preguntas y de usuarios asignados
+    trivia_question_ids = [None] + [
+        sorted(rng.sample(range(1, questions + 1), min(rng.randint(*QUESTIONS_PER_TRIVIA), questions)))
+        for _ in range(trivias)
+    ]
+    insert("trivias", Trivia.__table__, ("id", "name", "description"), (
+        (trivia_id, f"Trivia {trivia_id} de {TOPICS[trivia_id % len(TOPICS)]}", f"Preguntas de {TOPICS[trivia_id % len(TOPICS)]}")
+        for trivia_id in range(1, trivias + 1)
+    ))
+    insert("trivia_questions", trivia_questions, ("trivia_id", "question_id"), (
+        (trivia_id, question_id)
+        for trivia_id in range(1, trivias + 1) for question_id in trivia_question_ids[trivia_id]
+    ))
+    insert("trivia_users", trivia_users, ("trivia_id", "user_id"), (
+        (trivia_id, user_id)
+        for trivia_id in range(1, trivias + 1)
+        for user_id in sorted(rng.sample(range(1, users + 1), min(rng.randint(*USERS_PER_TRIVIA), users)))
+    ))
+
+    # Clave de cada trivia: (respuesta correcta, respuestas incorrectas, factor, puntos), con
+    # cada respuesta ya escrita como '"<id>": "<opción>"' (el mismo texto que json.dumps;
+    # los ids y las opciones no necesitan escaparse)
+    answer_keys = [None]
+    for question_ids in trivia_question_ids[1:]:
+        key = []
+        for question_id in question_ids:
+            difficulty = DIFFICULTIES[difficulty_of[question_id]]
+            correct_key = OPTION_KEYS[correct_of[question_id]]
+            correct = f'"{question_id}": "{correct_key}"'
+            wrong = tuple(f'"{question_id}": "{option}"' for option in OPTION_KEYS if option != correct_key)
+            key.append((correct, wrong, DIFFICULTY_FACTOR[difficulty], DIFFICULTY_POINTS[difficulty]))
+        answer_keys.append(key)
+
+    # Participaciones: se generan una vez y cada lote se inserta en participate y en ranking
+    skills = array("d", (1.0 - math.sqrt(random_value()) for _ in range(users + 1)))  # beta(1, 2)
+    cum_trivias = _cum_zipf(trivias, TRIVIA_POPULARITY_EXPONENT)
+    cum_users = _cum_zipf(users, USER_ACTIVITY_EXPONENT)
+    user_step = _stride(users)
+
+    participation_id = 0
+    while participation_id < participations:
+        size = min(batch_size, participations - participation_id)
+        trivia_ids = rng.choices(range(1, trivias + 1), cum_weights=cum_trivias, k=size)
+        user_ranks = rng.choices(range(users), cum_weights=cum_users, k=size)
+        participate_rows = []
+        ranking_rows = []
+        for trivia_id, rank in zip(trivia_ids, user_ranks):
+            participation_id += 1
+            user_id = rank * user_step % users + 1
+            skill = skills[user_id]
+            answers = []
+            score = 0
+            for correct, wrong, factor, points in answer_keys[trivia_id]:
+                if random_value() < skill * factor:
+                    answers.append(correct)
+                    score += points
+                else:
+                    answers.append(wrong[random_value() < 0.5])
+            participate_rows.append((participation_id, f"user{user_id}", trivia_id, "{" + ", ".join(answers) + "}", score))
+            ranking_rows.append((participation_id, trivia_id, user_id, score))
+        _insert(connection, Participate.__table__, PARTICIPATE_COLUMNS, iter(participate_rows), batch_size)
+        _insert(connection, Ranking.__table__, RANKING_COLUMNS, iter(ranking_rows), batch_size)
+
+    counts["participations"] = counts["rankings"] = participation_id
+    return counts
+
+
+def _cumulative(weights):
+    total = 0.0
+    for weight in weights:
+        total += weight
+        yield total
@@ -0,0 +1,26 @@
+from .database import db
+from . import write_behind
+
+# Funciones del ciclo de vida de los workers del servidor de producción (gunicorn.conf.py).
+# Con preload_app la app se crea una sola vez en el proceso master y los workers se
+# obtienen con fork. Una conexión SQLite no puede compartirse entre procesos, así
+# que el master cierra sus conexiones antes de cada fork y cada worker arranca con
+# un pool vacío y abre las suyas.
+
+
+# En el master, antes del fork: cerrar las conexiones abiertas al crear la app
+def release_connections(app):
+    with app.app_context():
+        db.engine.dispose()
+
+
+# En el worker, después del fork: pool nuevo sin tocar las conexiones heredadas
+# (cerrarlas desde el hijo podría liberar los locks de SQLite del master)
+def reset_after_fork(app):
+    with app.app_context():
+        db.engine.pool = db.engine.pool.recreate()
+
+
+# Al salir un worker: guardar las escrituras pendientes antes de terminar
+def shutdown_worker():
+    write_behind.stop_all()
@@ -0,0 +1,86 @@
+import functools
+import random
+import sqlite3
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from .database import db
+
+# Perfil de producción para SQLite.
+# Los PRAGMA se aplican a cada conexión nueva mediante el evento "connect" del
+# engine: WAL permite leer mientras otro proceso escribe, synchronous=NORMAL evita
+# un fsync por commit (seguro con WAL), y busy_timeout hace que SQLite espere el
+# lock en vez de fallar de inmediato. Las escrituras que igual reciben
+# "database is locked" se reintentan con backoff exponencial (retry_on_locked).
+
+DEFAULT_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,  # negativo = KiB (64 MB)
+    "busy_timeout": 5000,  # ms
+    "foreign_keys": None,  # None = no se modifica
+}
+
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.05
+
+_profile = None
+
+
+# Ejecutar los PRAGMA del perfil en una conexión sqlite3 recién abierta
+def _apply_profile(dbapi_connection, connection_record):
+    if _profile is None or not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in _profile.items():
+            if value is not None:
+                cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+
+# Activar el perfil (None lo desactiva) para las conexiones que se abran de ahora en adelante
+def configure(profile=None):
+    global _profile
+
+    if profile is not None:
+        unknown = set(profile) - set(DEFAULT_PROFILE)
+        if unknown:
+            raise ValueError(f"PRAGMA no soportados en el perfil: {sorted(unknown)}")
+        profile = {**DEFAULT_PROFILE, **profile}
+
+    _profile = profile
+    if not event.contains(Engine, "connect", _apply_profile):
+        event.listen(Engine, "connect", _apply_profile)
+
+
+# Leer el perfil desde la configuración de la app (SQLITE_PROFILE=0 lo desactiva)
+def profile_from_config(config):
+    if not config.get('SQLITE_PROFILE', True):
+        return None
+    return {pragma: config[f"SQLITE_{pragma.upper()}"]
+            for pragma in DEFAULT_PROFILE if f"SQLITE_{pragma.upper()}" in config}
+
+
+def is_locked_error(error):
+    message = str(getattr(error, 'orig', error)).lower()
+    return isinstance(error, OperationalError) and ("database is locked" in message or "database is busy" in message)
+
+
+# Reintentar una escritura cuando SQLite responde "database is locked"
+def retry_on_locked(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return fn(*args, **kwargs)
+            except OperationalError as e:
+                if not is_locked_error(e) or attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                db.session.rollback()
+                time.sleep(RETRY_BASE_DELAY * (2 ** attempt) * (0.5 + random.random()))
+    return wrapper
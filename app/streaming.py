@@ -0,0 +1,60 @@
+from flask import Response, stream_with_context, json, current_app
+
+# Respuestas JSON en streaming para exportaciones grandes.
+# Las filas se leen de la base de datos por lotes (yield_per) y se escriben a
+# medida que llegan, así la memoria no depende del número de filas.
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = ('json', 'ndjson')
+
+
+# Función encode del encoder JSON de la app, creada una sola vez por exportación
+# (flask.json.dumps vuelve a leer la app y la configuración en cada llamada)
+def _row_encoder():
+    return current_app.json_encoder(
+        ensure_ascii=current_app.config['JSON_AS_ASCII'],
+        sort_keys=current_app.config['JSON_SORT_KEYS']
+    ).encode
+
+
+# Agrupar las filas serializadas en bloques para no escribir fila por fila
+def _chunks(rows, serialize, separator):
+    encode = _row_encoder()
+    buffer = []
+    for row in rows:
+        buffer.append(encode(serialize(row)))
+        if len(buffer) >= EXPORT_BATCH_SIZE:
+            yield separator.join(buffer)
+            buffer = []
+    if buffer:
+        yield separator.join(buffer)
+
+
+# Una línea JSON por fila
+def ndjson_lines(rows, serialize):
+    for chunk in _chunks(rows, serialize, "\n"):
+        yield chunk + "\n"
+
+
+# El mismo sobre {"code", "message", "data"} del resto de la API, con data en streaming
+def json_envelope(rows, serialize, message):
+    yield '{"code":"200","message":%s,"data":[' % json.dumps(message)
+    first = True
+    for chunk in _chunks(rows, serialize, ","):
+        if not first:
+            yield ","
+        yield chunk
+        first = False
+    yield "]}"
+
+
+# Construir la respuesta en el formato pedido ('json' o 'ndjson')
+def export_response(rows, serialize, export_format, message):
+    if export_format == 'ndjson':
+        body = ndjson_lines(rows, serialize)
+        mimetype = 'application/x-ndjson'
+    else:
+        body = json_envelope(rows, serialize, message)
+        mimetype = 'application/json'
+
+    return Response(stream_with_context(body), mimetype=mimetype)
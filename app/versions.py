@@ -0,0 +1,76 @@
+import hashlib
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from .database import db
+from .models import ResourceVersion
+
+# Versiones por recurso para ETag / If-None-Match.
+# Cada mutador incrementa la versión de los recursos que modifica dentro de su propia
+# transacción, así la versión queda guardada junto con el cambio y es la misma para
+# todos los procesos. Leer la versión es una consulta por clave primaria, mucho más
+# barata que armar la respuesta.
+
+TRIVIAS = "trivias"      # listado de trivias y sus asociaciones
+QUESTIONS = "questions"  # texto de las preguntas (incluido en GET /trivias/<id>)
+USERS = "users"          # nombres de usuario (incluidos en trivias y rankings)
+
+_table = ResourceVersion.__table__
+
+# Motores con INSERT ... ON CONFLICT; el resto usa UPDATE y luego INSERT
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# Funciones llamadas con los recursos modificados en cada bump (p. ej. la caché de respuestas)
+_listeners = []
+
+
+def on_bump(listener):
+    _listeners.append(listener)
+
+
+def trivia(trivia_id):
+    return f"trivia:{trivia_id}"
+
+
+def ranking(trivia_id):
+    return f"ranking:{trivia_id}"
+
+
+# Incrementar la versión de los recursos en la transacción en curso (sesión o conexión)
+def bump(*resources, connection=None):
+    execute = connection.execute if connection is not None else db.session.execute
+    dialect = connection.dialect if connection is not None else db.engine.dialect
+    resources = sorted(set(resources))
+    for listener in _listeners:
+        listener(resources)
+
+    # Un solo INSERT ... ON CONFLICT DO UPDATE para todos los recursos
+    upsert = _UPSERT_DIALECTS.get(dialect.name)
+    if upsert is not None:
+        statement = upsert(_table).values([{"resource": resource, "version": 1} for resource in resources])
+        execute(statement.on_conflict_do_update(
+            index_elements=[_table.c.resource], set_={"version": _table.c.version + 1}
+        ))
+        return
+
+    for resource in resources:
+        result = execute(
+            _table.update().where(_table.c.resource == resource).values(version=_table.c.version + 1)
+        )
+        if result.rowcount == 0:
+            execute(_table.insert().values(resource=resource, version=1))
+
+
+# Versiones actuales de los recursos (0 si nunca se modificaron)
+def current(*resources):
+    rows = db.session.execute(
+        select(_table.c.resource, _table.c.version).where(_table.c.resource.in_(resources))
+    )
+    found = dict(rows.all())
+    return tuple(found.get(resource, 0) for resource in resources)
+
+
+# ETag fuerte a partir de las versiones de los recursos y de la variante pedida (query string)
+def etag(*resources, variant=""):
+    versions = current(*resources)
+    raw = ";".join(f"{resource}={version}" for resource, version in zip(resources, versions))
+    return hashlib.sha1(f"{raw}|{variant}".encode()).hexdigest()
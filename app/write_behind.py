@@ -0,0 +1,200 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+# Escritura diferida (write-behind) de participaciones.
+# El request encola la escritura y responde de inmediato; un hilo escritor por
+# proceso toma todo lo acumulado en la cola (hasta batch_size elementos) y lo escribe
+# en una sola transacción. La cola es acotada: si está llena, submit espera hasta
+# enqueue_timeout segundos y luego rechaza el elemento (QueueFull -> 503), así una
+# ráfaga no consume memoria sin límite. Al terminar el proceso se vacía la cola antes
+# de salir (atexit). Un elemento encolado se pierde solo si el proceso muere de forma
+# abrupta antes de escribirlo.
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_ENQUEUE_TIMEOUT = 0.5
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class QueueFull(Exception):
+    pass
+
+
+class WriteBehindQueue:
+    def __init__(self, write_batch, on_written=None, max_size=DEFAULT_MAX_SIZE,
+                 batch_size=DEFAULT_BATCH_SIZE, enqueue_timeout=DEFAULT_ENQUEUE_TIMEOUT):
+        self.write_batch = write_batch  # lista de elementos -> lista de resultados
+        self.on_written = on_written    # (elementos, resultados) después de cada commit
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.enqueue_timeout = enqueue_timeout
+        self._queue = queue.Queue(max_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._inflight_since = None
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.last_batch_lag = 0.0
+
+    # Encolar un elemento; espera hasta enqueue_timeout si la cola está llena
+    def submit(self, item):
+        self._ensure_writer()
+        try:
+            self._queue.put((time.monotonic(), item), timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFull("La cola de escrituras está llena")
+        with self._lock:
+            self.enqueued += 1
+
+    # El hilo escritor se crea al primer uso y de nuevo en cada proceso hijo (después de un fork)
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(self.max_size)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                return
+
+            group = [first]
+            stop = False
+            while len(group) < self.batch_size:
+                try:
+                    pending = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is _STOP:
+                    stop = True
+                    self._queue.task_done()
+                    break
+                group.append(pending)
+
+            self._write(group)
+            for _ in group:
+                self._queue.task_done()
+            if stop:
+                self._drain()
+                return
+
+    # Escribir lo que quede en la cola antes de terminar
+    def _drain(self):
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if pending is not _STOP:
+                self._write([pending])
+            self._queue.task_done()
+
+    def _write(self, group):
+        with self._lock:
+            self._inflight_since = group[0][0]
+        items = [item for _, item in group]
+        written, failed = [], 0
+        try:
+            written = list(zip(items, self.write_batch(items)))
+        except Exception:
+            # Si el lote falla se reintenta cada elemento por separado
+            for item in items:
+                try:
+                    written.append((item, self.write_batch([item])[0]))
+                except Exception:
+                    failed += 1
+                    logger.exception("No se pudo guardar un elemento de la cola de escrituras")
+
+        if written and self.on_written is not None:
+            try:
+                self.on_written([item for item, _ in written], [result for _, result in written])
+            except Exception:
+                logger.exception("Error al procesar elementos ya guardados")
+
+        with self._lock:
+            self._inflight_since = None
+            self.batches += 1
+            self.written += len(written)
+            self.failed += failed
+            self.last_batch_lag = time.monotonic() - group[0][0]
+
+    # Esperar a que todo lo encolado hasta ahora esté escrito
+    def flush(self):
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    # Vaciar la cola y detener el hilo escritor
+    def stop(self, timeout=None):
+        with self._lock:
+            thread = self._thread if self._pid == os.getpid() else None
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    # Antigüedad del elemento más viejo aún no escrito
+    def lag(self):
+        oldest = self._inflight_since
+        with self._queue.mutex:
+            if self._queue.queue and self._queue.queue[0] is not _STOP:
+                head = self._queue.queue[0][0]
+                oldest = head if oldest is None else min(oldest, head)
+        return time.monotonic() - oldest if oldest is not None else 0.0
+
+    def stats(self):
+        lag = self.lag()
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "max_size": self.max_size,
+                "batch_size": self.batch_size,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "lag_seconds": round(lag, 4),
+                "last_batch_lag_seconds": round(self.last_batch_lag, 4)
+            }
+
+
+_queues = []
+
+
+# Vaciar las colas activas de este proceso al salir
+def stop_all():
+    for write_queue in list(_queues):
+        write_queue.stop()
+
+
+def register(write_queue):
+    _queues.append(write_queue)
+    return write_queue
+
+
+def unregister(write_queue):
+    if write_queue in _queues:
+        _queues.remove(write_queue)
+    write_queue.stop()
+
+
+atexit.register(stop_all)
@@ -0,0 +1,285 @@
+"""Benchmark de todos los endpoints con datos sembrados a distintas escalas.
+
+Siembra (app/seeding.py) una base de datos SQLite con 1k/100k/1M filas de usuarios, preguntas,
+participaciones y rankings, ejecuta cada ruta del blueprint con el cliente de
+pruebas y reporta throughput y latencias p50/p95/p99 por endpoint. Los resultados se
+guardan en JSON para comparar entre commits.
+
+Uso:
+    python benchmarks/bench_endpoints.py --scale 1k --scale 100k --output results.json
+    python benchmarks/bench_endpoints.py --scale 1k --compare results-anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from app import create_app
+from app.config import Config
+from app.database import db
+from app.migrations import migrate
+from app.models import trivia_questions
+from app.seeding import SCALES, DEFAULT_PASSWORD, GENERATOR_VERSION, plan_for_rows, seed, user_email
+
+DEFAULT_DATA_DIR = os.path.join(ROOT, 'benchmarks', '.data')
+PASSWORD_METHOD = "pbkdf2:sha256:1000"
+REGRESSION_THRESHOLD = 0.10
+SEARCH_TERMS = ("geografia", "capital historia", "plan", "musica record", "rio")
+
+
+def bench_config(db_file):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_file}'
+        JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "clave-de-benchmark")
+        PASSWORD_HASH_METHOD = PASSWORD_METHOD
+        PASSWORD_HASH_WORKERS = 0
+    return BenchConfig
+
+
+# Base de datos sembrada para una escala (se reutiliza entre ejecuciones)
+def seeded_database(scale, data_dir):
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"bench-{scale}-g{GENERATOR_VERSION}.db")
+    meta_path = path + ".json"
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            return path, json.load(f)
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    app = create_app(bench_config(path))
+    start = time.perf_counter()
+    with app.app_context():
+        migrate(db.engine)
+        rows = seed(db.engine, **plan_for_rows(SCALES[scale]), password_method=PASSWORD_METHOD)
+        db.session.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        db.engine.dispose()
+    meta = {"rows": rows, "seed_seconds": round(time.perf_counter() - start, 2)}
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    return path, meta
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+# Escenarios: (endpoint, método, función i -> (ruta, cuerpo JSON), cantidad máxima de requests).
+# Los de solo lectura van primero; las escrituras y los borrados usan ids distintos en cada request.
+def scenarios(rows, requests):
+    users = rows["users"]
+    questions = rows["questions"]
+    trivias = rows["trivias"]
+    ctx = rows["context"]
+    answers = {str(q): "option_1" for q in ctx["trivia_question_ids"]}
+    few = max(1, requests // 10)
+
+    def question_body(i):
+        return {"question_text": f"Nueva {i}", "correct_option": "A", "options": ["A", "B", "C"], "difficulty": "fácil"}
+
+    return [
+        ("GET /users", "GET", lambda i: ("/users?limit=50", None), requests),
+        ("GET /questions", "GET", lambda i: ("/questions?limit=50", None), requests),
+        ("GET /questions/search", "GET", lambda i: (f"/questions/search?q={SEARCH_TERMS[i % len(SEARCH_TERMS)]}&limit=50", None), requests),
+        ("GET /questions/export", "GET", lambda i: ("/questions/export?format=ndjson", None), min(requests, 3)),
+        ("GET /trivias", "GET", lambda i: ("/trivias?limit=50", None), requests),
+        ("GET /trivias/<trivia_id>", "GET", lambda i: (f"/trivias/{1 + i % trivias}", None), requests),
+        ("GET /users/<user_id>/trivias", "GET", lambda i: (f"/users/{ctx['member_user_id']}/trivias", None), requests),
+        ("GET /ranking/<trivia_id>", "GET", lambda i: (f"/ranking/{1 + i % trivias}", None), requests),
+        ("GET /ranking/<trivia_id>/users/<user_id>", "GET",
+         lambda i: (f"/ranking/{ctx['ranked_trivia_id']}/users/{ctx['ranked_user_id']}", None), requests),
+        ("GET /ranking/<trivia_id>/export", "GET", lambda i: (f"/ranking/{1 + i % trivias}/export", None), few),
+        ("GET /status", "GET", lambda i: ("/status", None), requests),
+        ("POST /login", "POST", lambda i: ("/login", {"email": user_email(2), "password": DEFAULT_PASSWORD}), few),
+        ("POST /register", "POST",
+         lambda i: ("/register", {"name": f"nuevo{i}", "email": f"nuevo{i}@bench.local", "password": DEFAULT_PASSWORD}), few),
+        ("POST /questions", "POST", lambda i: ("/questions", question_body(i)), requests),
+        ("POST /questions/bulk", "POST", lambda i: ("/questions/bulk", [question_body(i * 100 + j) for j in range(100)]), few),
+        ("POST /trivias", "POST", lambda i: ("/trivias", {
+            "name": f"Nueva trivia {i}", "description": "Benchmark",
+            "question_ids": ctx["trivia_question_ids"], "user_ids": list(range(2, 22))
+        }), few),
+        ("POST /participate/<trivia_id>", "POST",
+         lambda i: (f"/participate/{ctx['trivia_id']}", {"user_name": "user2", "trivia_id": ctx['trivia_id'], "answers": answers}), requests),
+        ("POST /participate/batch", "POST", lambda i: ("/participate/batch", {"submissions": [
+            {"user_name": f"user{2 + j}", "trivia_id": ctx['trivia_id'], "answers": answers} for j in range(100)
+        ]}), few),
+        ("PUT /users/<user_id>", "PUT", lambda i: (f"/users/{2 + i}", {"name": f"user{2 + i}"}), few),
+        ("PUT /questions/<question_id>", "PUT", lambda i: (f"/questions/{1 + i}", {"question_text": f"Editada {i}"}), few),
+        ("PUT /trivias/<trivia_id>", "PUT", lambda i: (f"/trivias/{1 + i % trivias}", {"name": f"Editada {i}"}), few),
+        ("DELETE /trivias/<trivia_id>", "DELETE", lambda i: (f"/trivias/{trivias - i}", None), min(few, trivias // 2)),
+        ("DELETE /questions/<question_id>", "DELETE", lambda i: (f"/questions/{questions - i}", None), few),
+        ("DELETE /users/<user_id>", "DELETE", lambda i: (f"/users/{users - i}", None), few),
+    ]
+
+
+# Datos de la base sembrada que necesitan los escenarios
+def scenario_context(app):
+    with app.app_context():
+        trivia_id = 1
+        question_ids = [row[0] for row in db.session.execute(
+            trivia_questions.select().with_only_columns(trivia_questions.c.question_id)
+            .where(trivia_questions.c.trivia_id == trivia_id)
+        )]
+        member = db.session.execute("SELECT user_id FROM trivia_users ORDER BY trivia_id, user_id LIMIT 1").scalar()
+        ranked = db.session.execute("SELECT trivia_id, user_id FROM ranking ORDER BY id LIMIT 1").first()
+    return {
+        "trivia_id": trivia_id,
+        "trivia_question_ids": question_ids,
+        "member_user_id": member,
+        "ranked_trivia_id": ranked[0],
+        "ranked_user_id": ranked[1],
+    }
+
+
+def run_scenario(client, headers, method, build, count, concurrency):
+    def call(i):
+        path, body = build(i)
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        response.get_data()
+        elapsed = time.perf_counter() - start
+        return elapsed, response.status_code
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(call, range(count)))
+    else:
+        results = [call(i) for i in range(count)]
+    wall = time.perf_counter() - start
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in results)
+    errors = sum(1 for _, status in results if status >= 400)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+def bench_scale(scale, args):
+    seeded, meta = seeded_database(scale, args.data_dir)
+    print(f"\n== escala {scale}: {meta['rows']} (siembra: {meta['seed_seconds']} s)")
+
+    # Cada ejecución trabaja sobre una copia para no alterar la base sembrada
+    work_dir = tempfile.mkdtemp()
+    db_file = os.path.join(work_dir, "bench.db")
+    shutil.copyfile(seeded, db_file)
+    try:
+        app = create_app(bench_config(db_file))
+        client = app.test_client()
+        token = client.post('/login', json={"email": user_email(1), "password": DEFAULT_PASSWORD}).json['token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        rows = dict(meta["rows"], context=scenario_context(app))
+        results = {}
+        specs = scenarios(rows, args.requests)
+        check_coverage(app, [name for name, _, _, _ in specs])
+
+        for name, method, build, count in specs:
+            if args.only and not any(fragment in name for fragment in args.only):
+                continue
+            result = run_scenario(client, headers, method, build, max(count, 1), args.concurrency)
+            results[name] = result
+            print(f"{name:<42} {result['throughput_rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.2f}  "
+                  f"p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  errores {result['errors']}")
+
+        with app.app_context():
+            db.engine.dispose()
+        return {"rows": meta["rows"], "seed_seconds": meta["seed_seconds"], "endpoints": results}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# Avisar si alguna ruta del blueprint no tiene escenario
+def check_coverage(app, names):
+    routes = set()
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.startswith('main.'):
+            path = rule.rule.replace('<int:', '<')
+            for method in rule.methods - {'HEAD', 'OPTIONS'}:
+                routes.add(f"{method} {path}")
+    missing = sorted(routes - set(names))
+    if missing:
+        print(f"Rutas sin escenario: {', '.join(missing)}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+# Comparar con un resultado anterior: variación de p50/p95 y throughput por endpoint
+def compare(previous, current):
+    print(f"\n== comparación con {previous.get('commit')} ({previous.get('timestamp')})")
+    regressions = 0
+    for scale, data in current["scales"].items():
+        before = previous.get("scales", {}).get(scale, {}).get("endpoints", {})
+        for name, result in data["endpoints"].items():
+            old = before.get(name)
+            if not old:
+                continue
+            p95 = (result["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+            rps = (result["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] if old["throughput_rps"] else 0.0
+            flag = "  <- regresión" if p95 > REGRESSION_THRESHOLD else ""
+            regressions += bool(flag)
+            print(f"[{scale}] {name:<42} p95 {p95:+7.1%}  throughput {rps:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', action='append', choices=list(SCALES), help="escala de datos (se puede repetir; por defecto 1k)")
+    parser.add_argument('--requests', type=int, default=200, help="requests por endpoint")
+    parser.add_argument('--concurrency', type=int, default=1, help="hilos que envían requests")
+    parser.add_argument('--only', action='append', help="solo los endpoints que contienen este texto")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="carpeta de las bases sembradas")
+    parser.add_argument('--output', help="archivo JSON con los resultados")
+    parser.add_argument('--compare', help="resultado JSON anterior para comparar")
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scales": {scale: bench_scale(scale, args) for scale in (args.scale or ["1k"])}
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
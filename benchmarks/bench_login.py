@@ -0,0 +1,65 @@
+"""Benchmark de /login: logins por segundo y por núcleo.
+
+Uso:
+    python benchmarks/bench_login.py --logins 200 --concurrency 8 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.config import Config
+from app.models import db, User
+from app import security
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="procesos del pool de hash (0 = en el hilo del request)")
+    parser.add_argument('--method', default=security.DEFAULT_METHOD)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_file}'
+        JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "clave-de-benchmark")
+
+    app = create_app(BenchConfig)
+    security.configure(args.method, args.workers, queue_limit=max(args.concurrency, args.workers) * 4)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(name="bench", email="bench@example.com", password=security.hash_password("benchpassword")))
+        db.session.commit()
+
+    client = app.test_client()
+
+    def login(_):
+        response = client.post('/login', json={'email': 'bench@example.com', 'password': 'benchpassword'})
+        return response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        statuses = list(executor.map(login, range(args.logins)))
+    elapsed = time.perf_counter() - start
+
+    # Núcleos que realmente calculan hashes: los procesos del pool o, sin pool, los hilos del request
+    cores = min(args.workers or args.concurrency, os.cpu_count() or 1)
+    ok = statuses.count(200)
+    print(f"método: {args.method}  workers: {args.workers}  concurrencia: {args.concurrency}")
+    print(f"logins exitosos: {ok}/{args.logins}  rechazados (503): {statuses.count(503)}")
+    print(f"logins/s: {ok / elapsed:.1f}  logins/s por núcleo: {ok / elapsed / cores:.1f}")
+
+    os.unlink(db_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark del perfil de SQLite: escrituras y lecturas concurrentes con y sin el perfil.
+
+Uso:
+    python benchmarks/bench_sqlite_profile.py --writes 500 --reads 2000 --concurrency 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+from app import sqlite_profile
+
+
+def run(profile, args):
+    sqlite_profile.configure(profile)
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+    engine = create_engine(f'sqlite:///{db_file}', connect_args={"check_same_thread": False},
+                           poolclass=QueuePool, pool_size=args.concurrency, max_overflow=0)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE ranking (id INTEGER PRIMARY KEY, trivia_id INTEGER, score INTEGER)"))
+
+    errors = []
+
+    def write(i):
+        try:
+            with engine.begin() as connection:
+                connection.execute(text("INSERT INTO ranking (trivia_id, score) VALUES (:t, :s)"), {"t": i % 10, "s": i % 30})
+        except Exception as e:
+            errors.append(e)
+
+    def read(i):
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT score FROM ranking WHERE trivia_id = :t ORDER BY score DESC LIMIT 10"), {"t": i % 10}).fetchall()
+        except Exception as e:
+            errors.append(e)
+
+    # Escrituras y lecturas intercaladas, como en /participate y /ranking
+    jobs = [write] * args.writes + [read] * args.reads
+    jobs = [jobs[i] for i in sorted(range(len(jobs)), key=lambda i: (i * 7919) % len(jobs))]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(lambda job_i: job_i[1](job_i[0]), enumerate(jobs)))
+    elapsed = time.perf_counter() - start
+
+    engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_file + suffix):
+            os.remove(db_file + suffix)
+    return len(jobs) / elapsed, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writes', type=int, default=500)
+    parser.add_argument('--reads', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    for label, profile in (("sin perfil", None), ("perfil WAL", {})):
+        ops, errors = run(profile, args)
+        print(f"{label:<12} {ops:10.1f} ops/s  errores: {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark de arranque: importación en frío del paquete y latencia de create_app.
+
+Uso:
+    python benchmarks/bench_startup.py --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# Importación en un intérprete nuevo (como un worker recién creado sin preload)
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+
+
+def cold_import_times(runs):
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, capture_output=True, text=True, check=True)
+        times.append(float(output.stdout.strip()))
+    return times
+
+
+def create_app_times(runs, db_file):
+    from app import create_app
+    from app.config import Config
+    from app.database import db
+    from app.migrations import migrate
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_file}'
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        migrate(db.engine)
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        create_app(BenchConfig)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summary(label, times):
+    times_ms = sorted(t * 1000 for t in times)
+    p95 = times_ms[min(len(times_ms) - 1, int(len(times_ms) * 0.95))]
+    print(f"{label:<14} mediana: {statistics.median(times_ms):8.1f} ms  p95: {p95:8.1f} ms  mín: {times_ms[0]:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+    try:
+        summary("import app", cold_import_times(args.runs))
+        summary("create_app", create_app_times(args.runs, db_file))
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_file + suffix):
+                os.remove(db_file + suffix)
+
+
+if __name__ == "__main__":
+    main()
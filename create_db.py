@@ -1,7 +1,50 @@
+"""Crear o actualizar el esquema de la base de datos.
+
+Uso:
+    python create_db.py            # aplicar las migraciones pendientes
+    python create_db.py --status   # mostrar la versión actual del esquema
+    python create_db.py --rebuild-search   # reconstruir el índice de búsqueda de preguntas
+"""
+import argparse
+from dotenv import load_dotenv
+
+# Cargar las variables de entorno antes de leer la configuración
+load_dotenv()
+
 from app import create_app
 from app.database import db
+from app.migrations import migrate, current_version, LATEST_VERSION
+from app import search
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--status', action='store_true', help="mostrar la versión actual sin migrar")
+    parser.add_argument('--rebuild-search', action='store_true',
+                        help="migrar y reconstruir el índice de búsqueda desde la tabla question")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.status:
+            print(f"Versión del esquema: {current_version(db.engine)} (última: {LATEST_VERSION})")
+            return
+
+        applied = migrate(db.engine)
+        for version, description in applied:
+            print(f"Migración {version} aplicada: {description}")
+        if not applied:
+            print(f"El esquema ya está en la versión {LATEST_VERSION}")
+
+        if args.rebuild_search:
+            with db.engine.begin() as connection:
+                if not search.has_index(connection):
+                    print("La base de datos no usa el índice FTS5 (la búsqueda usa LIKE)")
+                    return
+                search.create_triggers(connection)
+                search.rebuild(connection)
+            print("Índice de búsqueda reconstruido")
 
-app = create_app()
 
-with app.app_context():
-    db.create_all()
+if __name__ == "__main__":
+    main()
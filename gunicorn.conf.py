@@ -0,0 +1,59 @@
+# Configuración del servidor de producción.
+# Uso: gunicorn -c gunicorn.conf.py app.main:app
+import multiprocessing
+import os
+import tempfile
+
+# Dirección y procesos: un worker por núcleo y, opcionalmente, varios hilos por worker
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.getenv("WEB_THREADS", 1))
+worker_class = "gthread" if threads > 1 else "sync"
+
+# La app reparte los núcleos entre los workers para su pool de hash (PASSWORD_HASH_WORKERS)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Crear la app una sola vez en el master (arranque más rápido y memoria compartida)
+preload_app = os.getenv("WEB_PRELOAD", "1") == "1"
+
+# Reciclar cada worker después de N requests (0 = nunca); el jitter evita que se reinicien todos juntos
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", max_requests // 10))
+
+# Tiempos: request máximo y espera para terminar los requests en curso al recargar (HUP) o apagar (TERM)
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("WEB_KEEPALIVE", 5))
+
+accesslog = os.getenv("WEB_ACCESS_LOG", "-")
+errorlog = "-"
+
+# Métricas de todos los workers (ver app/metrics.py): cada proceso escribe en este
+# directorio. Debe definirse antes de cargar la app y estar vacío al iniciar; si no
+# se indica se crea uno nuevo (al recargar con HUP la variable ya existe y se conserva)
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="trivia-metrics-")
+
+
+# Las conexiones a la base de datos se abren después del fork (ver app/server.py)
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        from app.server import release_connections
+        release_connections(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app.server import reset_after_fork
+        reset_after_fork(server.app.wsgi())
+
+
+def worker_exit(server, worker):
+    from app.server import shutdown_worker
+    shutdown_worker()
+
+
+# Los gauges de un worker terminado dejan de sumarse en /metrics
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
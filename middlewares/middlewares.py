@@ -1,7 +1,8 @@
 from flask import jsonify, request
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
 from functools import wraps
-from app.models import User
+from app import identity_cache
+from app.instrumentation import timed
 
 def jwt_required_middleware(role=None):
 
@@ -10,11 +11,12 @@ def jwt_required_middleware(role=None):
         def decorated_function(*args, **kwargs):
             try:
                 # Verify the JWT in the request
-                verify_jwt_in_request()
-                user_id = get_jwt_identity()
-                user = User.query.get(user_id)
+                with timed("auth"):
+                    verify_jwt_in_request()
+                    user_id = get_jwt_identity()
+                    user = identity_cache.lookup(user_id)
 
-                if not user:
+                if not user.exists:
                     return jsonify({
                         "code": "404",
                         "message": "Usuario no encontrado"
@@ -1,3 +1,8 @@
+from dotenv import load_dotenv
+
+# Cargar las variables de entorno antes de leer la configuración
+load_dotenv()
+
 from app import create_app
 
 # Crear la aplicación Flask
@@ -0,0 +1,60 @@
+"""Poblar la base de datos con datos sintéticos para pruebas de carga y de escala.
+
+Uso:
+    python seed_db.py --scale 1m                     # 1M usuarios, preguntas y participaciones
+    python seed_db.py --users 5000 --questions 20000 --trivias 300 --participations 2000000
+    python seed_db.py --scale 100k --seed 7          # otra semilla, otros datos
+
+La base de datos (DATABASE_URL) debe estar vacía; las migraciones pendientes se
+aplican antes de sembrar. Todos los usuarios tienen la misma contraseña (--password)
+y sus correos son user<id>@seed.local; el usuario 1 es administrador.
+"""
+import argparse
+import time
+from dotenv import load_dotenv
+
+# Cargar las variables de entorno antes de leer la configuración
+load_dotenv()
+
+from app import create_app
+from app.database import db
+from app.migrations import migrate
+from app.seeding import SCALES, DEFAULT_PASSWORD, DEFAULT_BATCH_SIZE, SeedError, plan_for_rows, seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='1k',
+                        help="cantidades base: usuarios = preguntas = participaciones, trivias = filas/100")
+    parser.add_argument('--users', type=int, help="usuarios (reemplaza el valor de la escala)")
+    parser.add_argument('--questions', type=int, help="preguntas")
+    parser.add_argument('--trivias', type=int, help="trivias")
+    parser.add_argument('--participations', type=int, help="participaciones (y filas de ranking)")
+    parser.add_argument('--seed', type=int, default=42, help="semilla del generador")
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help="contraseña de todos los usuarios")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="filas por executemany")
+    args = parser.parse_args()
+
+    plan = plan_for_rows(SCALES[args.scale])
+    for name in plan:
+        if getattr(args, name) is not None:
+            plan[name] = getattr(args, name)
+
+    app = create_app()
+    with app.app_context():
+        migrate(db.engine)
+        start = time.perf_counter()
+        try:
+            counts = seed(db.engine, **plan, seed=args.seed, password=args.password,
+                          password_method=app.config['PASSWORD_HASH_METHOD'], batch_size=args.batch_size)
+        except SeedError as e:
+            parser.exit(1, f"Error: {e}\n")
+        elapsed = time.perf_counter() - start
+
+    for table, count in counts.items():
+        print(f"{table:>16}: {count}")
+    print(f"Total: {sum(counts.values())} filas en {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import unittest
+from app.group_commit import GroupCommitter
+
+
+# Pruebas del group commit con una función de escritura simulada
+class TestGroupCommit(unittest.TestCase):
+
+    def test_concurrent_items_share_a_commit(self):
+        """Los elementos enviados al mismo tiempo se escriben en menos transacciones."""
+        batches = []
+
+        def write_batch(items):
+            batches.append(list(items))
+            return [item * 10 for item in items]
+
+        committer = GroupCommitter(write_batch, window=0.05)
+        results = {}
+
+        def submit(item):
+            results[item] = committer.submit(item)
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {i: i * 10 for i in range(16)})
+        self.assertLess(len(batches), 16)
+        self.assertEqual(sum(len(batch) for batch in batches), 16)
+
+
+    def test_failed_group_retries_items_individually(self):
+        """Si el grupo falla, solo el elemento inválido recibe el error."""
+        def write_batch(items):
+            if 'malo' in items:
+                raise ValueError("elemento inválido")
+            return items
+
+        committer = GroupCommitter(write_batch, window=0.05)
+        outcomes = {}
+
+        def submit(item):
+            try:
+                outcomes[item] = committer.submit(item)
+            except ValueError:
+                outcomes[item] = 'error'
+
+        threads = [threading.Thread(target=submit, args=(item,)) for item in ['bueno', 'malo', 'otro']]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(outcomes, {'bueno': 'bueno', 'malo': 'error', 'otro': 'otro'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import unittest
+from werkzeug.security import generate_password_hash
+from app import create_app, instrumentation
+from app.config import TestingConfig
+from app.models import db, User
+
+
+class TimingConfig(TestingConfig):
+    REQUEST_TIMING = True
+    SLOW_QUERY_MS = 0.000001
+
+
+# Pruebas de la cabecera Server-Timing, el log por request y el log de consultas lentas
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TimingConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        db.session.add(User(name="Admin", email="admin@example.com", password=generate_password_hash("password"), role="admin"))
+        db.session.commit()
+        token = self.client.post('/login', json={'email': 'admin@example.com', 'password': 'password'}).json['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+
+    def test_server_timing_header_and_request_log(self):
+        """Cada request informa tiempo de base de datos, autenticación, serialización y total."""
+        with self.assertLogs('app.requests', level='INFO') as logs:
+            response = self.client.get('/users', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        header = response.headers['Server-Timing']
+        for metric in ('db;dur=', 'auth;dur=', 'serialize;dur=', 'total;dur='):
+            self.assertIn(metric, header)
+
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line['endpoint'], 'main.get_users_route')
+        self.assertEqual(line['status'], 200)
+        self.assertGreaterEqual(line['queries'], 1)
+        self.assertIn('serialize_ms', line)
+
+
+    def test_slow_queries_are_logged_with_sql(self):
+        """Las consultas sobre el umbral se registran con su SQL."""
+        with self.assertLogs('app.slow_queries', level='WARNING') as logs:
+            self.client.get('/users', headers=self.headers)
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertIn('SELECT', entry['sql'])
+        self.assertEqual(entry['path'], '/users')
+
+
+    def test_disabled_by_default(self):
+        """Sin REQUEST_TIMING no se agrega la cabecera y una app nueva desactiva la configuración anterior."""
+        app = create_app(TestingConfig)
+        self.assertFalse(instrumentation._timing_enabled)
+        self.assertIsNone(instrumentation._slow_query_seconds)
+        with app.app_context():
+            db.create_all()
+            response = app.test_client().post('/login', json={'email': 'nadie@example.com', 'password': 'x'})
+        self.assertNotIn('Server-Timing', response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from app.leaderboard import Leaderboard, Entry
+
+
+# Pruebas unitarias de la estructura del leaderboard (sin base de datos)
+class TestLeaderboard(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Leaderboard()
+        # (id, user_id, score): empate en 10 entre los ids 2 y 4
+        for entry_id, user_id, score in [(1, 1, 5), (2, 2, 10), (3, 3, 7), (4, 4, 10), (5, 5, 1)]:
+            self.board.add(Entry(entry_id, user_id, f"User {user_id}", score))
+
+
+    def test_order_and_tie_breaking(self):
+        """A igual puntaje va primero el id menor; el rank es de competición."""
+        entries = self.board.top(5)
+        self.assertEqual([e.id for e in entries], [2, 4, 3, 1, 5])
+        self.assertEqual([self.board.rank(e.score) for e in entries], [1, 1, 3, 4, 5])
+        self.assertEqual([self.board.dense_rank(e.score) for e in entries], [1, 1, 2, 3, 4])
+
+
+    def test_page_after_key(self):
+        """Las páginas continúan justo después de la clave (puntaje, id)."""
+        first, next_key = self.board.page(2)
+        self.assertEqual([e.id for e in first], [2, 4])
+        self.assertEqual(next_key, [10, 4])
+
+        second, next_key = self.board.page(10, next_key)
+        self.assertEqual([e.id for e in second], [3, 1, 5])
+        self.assertIsNone(next_key)
+
+
+    def test_around_user(self):
+        """Vecinos por encima y por debajo de la mejor entrada del usuario."""
+        self.board.add(Entry(6, 1, "User 1", 8))
+        position = self.board.around(1, 1)
+
+        self.assertEqual(position["entry"].score, 8)
+        self.assertEqual(position["rank"], 3)
+        self.assertEqual([e.id for e in position["above"]], [4])
+        self.assertEqual([e.id for e in position["below"]], [3])
+        self.assertIsNone(self.board.around(99, 1))
+
+
+    def test_duplicates_and_large_scores(self):
+        """Las entradas repetidas se ignoran y el índice crece con puntajes altos."""
+        self.board.add(Entry(2, 2, "User 2", 10))
+        self.board.add(Entry(7, 6, "User 6", 1000))
+
+        self.assertEqual(self.board.total, 6)
+        self.assertEqual(self.board.top(1)[0].id, 7)
+        self.assertEqual(self.board.rank(10), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
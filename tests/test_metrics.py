@@ -0,0 +1,134 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import re
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+from werkzeug.security import generate_password_hash
+from app import create_app, metrics
+from app.config import TestingConfig
+from app.models import db, User
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+# Valor de una muestra del texto de exposición (0 si no existe)
+def sample(text, name, **labels):
+    pattern = re.escape(name)
+    if labels:
+        pattern += r'\{' + ",".join(f'{key}="{re.escape(value)}"' for key, value in labels.items()) + r'\}'
+    match = re.search(rf'^{pattern} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+# Pruebas del endpoint /metrics
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        db.session.add(User(name="Admin", email="admin@example.com", password=generate_password_hash("password"), role="admin"))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    # Las métricas de un request se registran al cerrar la respuesta, como hace el servidor WSGI
+    def request(self, method, path, **kwargs):
+        with self.client.open(path, method=method, **kwargs) as response:
+            return response
+
+    def scrape(self):
+        with self.client.get('/metrics') as response:
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.content_type.startswith('text/plain'))
+            return response.get_data(as_text=True)
+
+
+    def test_requests_are_counted_by_endpoint_and_status(self):
+        """Cada request suma al contador y al histograma de su endpoint y código de estado."""
+        before = self.scrape()
+        self.request('POST', '/login', json={'email': 'admin@example.com', 'password': 'password'})
+        self.request('POST', '/login', json={'email': 'admin@example.com', 'password': 'incorrecta'})
+        self.request('GET', '/no-existe')
+        after = self.scrape()
+
+        for labels, expected in (
+            ({'endpoint': 'main.login', 'method': 'POST', 'status': '200'}, 1),
+            ({'endpoint': 'main.login', 'method': 'POST', 'status': '401'}, 1),
+            ({'endpoint': 'unmatched', 'method': 'GET', 'status': '404'}, 1),
+        ):
+            delta = sample(after, 'trivia_http_requests_total', **labels) - sample(before, 'trivia_http_requests_total', **labels)
+            self.assertEqual(delta, expected)
+
+        count = 'trivia_http_request_duration_seconds_count'
+        labels = {'endpoint': 'main.login', 'status': '200'}
+        self.assertEqual(sample(after, count, **labels) - sample(before, count, **labels), 1)
+        # El propio scrape está en curso mientras se genera el texto
+        self.assertEqual(sample(after, 'trivia_http_requests_in_flight', endpoint='metrics'), 1)
+
+
+    def test_streamed_and_failed_requests(self):
+        """Una exportación se mide al terminar de enviar el cuerpo y una excepción se cuenta con estado 500."""
+        token = self.request('POST', '/login', json={'email': 'admin@example.com', 'password': 'password'}).json['token']
+        labels = {'endpoint': 'main.export_questions_route', 'method': 'GET', 'status': '200'}
+        before = self.scrape()
+
+        response = self.client.get('/questions/export', headers={'Authorization': f'Bearer {token}'})
+        self.assertTrue(response.is_streamed)
+        during = self.scrape()
+        self.assertEqual(sample(during, 'trivia_http_requests_total', **labels), sample(before, 'trivia_http_requests_total', **labels))
+        self.assertEqual(sample(during, 'trivia_http_requests_in_flight', endpoint='main.export_questions_route'), 1)
+        response.get_data()
+        response.close()
+        after = self.scrape()
+        self.assertEqual(sample(after, 'trivia_http_requests_total', **labels) - sample(before, 'trivia_http_requests_total', **labels), 1)
+        self.assertEqual(sample(after, 'trivia_http_requests_in_flight', endpoint='main.export_questions_route'), 0)
+
+        def boom():
+            raise RuntimeError("falla")
+        self.app.add_url_rule('/falla', 'falla', boom)
+        with self.assertRaises(RuntimeError):
+            self.client.get('/falla')
+        labels = {'endpoint': 'falla', 'method': 'GET', 'status': '500'}
+        self.assertEqual(sample(self.scrape(), 'trivia_http_requests_total', **labels), 1)
+
+
+    def test_pool_and_password_hashing_metrics(self):
+        """Se publican los préstamos del pool y el tiempo de verificación de contraseñas."""
+        before = self.scrape()
+        self.request('POST', '/login', json={'email': 'admin@example.com', 'password': 'password'})
+        after = self.scrape()
+
+        self.assertGreater(sample(after, 'trivia_db_pool_checkouts_total'), sample(before, 'trivia_db_pool_checkouts_total'))
+        count = 'trivia_password_hash_seconds_count'
+        self.assertEqual(sample(after, count, operation='verify') - sample(before, count, operation='verify'), 1)
+
+
+    def test_values_are_aggregated_across_processes(self):
+        """Con PROMETHEUS_MULTIPROC_DIR /metrics suma los valores de todos los procesos."""
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory)
+            script = "from app import metrics; metrics.REQUESTS.labels('main.participate', 'POST', '201').inc(3)"
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, check=True)
+
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                text = metrics.render().decode()
+
+        labels = {'endpoint': 'main.participate', 'method': 'POST', 'status': '201'}
+        self.assertEqual(sample(text, 'trivia_http_requests_total', **labels), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from sqlalchemy import inspect, text
+from app import create_app, search
+from app.config import TestingConfig
+from app.models import db
+from app.migrations import migrate, current_version, LATEST_VERSION, MIGRATIONS
+
+
+# Pruebas de las migraciones versionadas del esquema
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        with db.engine.begin() as connection:
+            search.drop_index(connection)
+            connection.execute(text("DROP TABLE IF EXISTS schema_version"))
+        self.app_context.pop()
+
+
+    def test_create_app_does_not_touch_the_schema(self):
+        """create_app no crea tablas; el esquema se crea con las migraciones."""
+        self.assertEqual(inspect(db.engine).get_table_names(), [])
+        self.assertEqual(current_version(db.engine), 0)
+
+
+    def test_migrate_applies_pending_versions_once(self):
+        """Las migraciones se aplican en orden y una segunda ejecución no hace nada."""
+        applied = migrate(db.engine)
+        self.assertEqual([version for version, _ in applied], [version for version, _, _ in MIGRATIONS])
+        self.assertEqual(current_version(db.engine), LATEST_VERSION)
+        self.assertIn('trivia', inspect(db.engine).get_table_names())
+
+        self.assertEqual(migrate(db.engine), [])
+
+
+    def test_migrate_existing_database(self):
+        """Una base creada antes de las migraciones recibe los índices que le faltan."""
+        db.create_all()
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_ranking_trivia_score"))
+
+        migrate(db.engine)
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('ranking')}
+        self.assertIn('ix_ranking_trivia_score', indexes)
+
+
+if __name__ == "__main__":
+    unittest.main()
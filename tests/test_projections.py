@@ -0,0 +1,73 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from app import create_app
+from app.config import TestingConfig
+from app.models import db, User, Question, Trivia, Ranking
+from app.instrumentation import count_queries
+from app.projections import get_users, get_questions, iter_questions, rankings_since, iter_ranking
+
+
+# Pruebas de las consultas de solo lectura: columnas justas y sin objetos del ORM
+class TestProjections(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        db.session.add_all([
+            User(id=i, name=f"user{i}", email=f"user{i}@example.com", password="x", role="jugador")
+            for i in range(1, 6)
+        ])
+        db.session.add_all([
+            Question(id=i, question_text=f"Pregunta {i}", correct_option="A", option_1="A",
+                     option_2="B", option_3="C", difficulty="fácil")
+            for i in range(1, 6)
+        ])
+        db.session.add(Trivia(id=1, name="Trivia", description="Descripción"))
+        db.session.add_all([Ranking(trivia_id=1, user_id=i, score=i * 10) for i in range(1, 6)])
+        db.session.commit()
+        db.session.expunge_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+
+    def test_pages_return_rows_outside_the_session(self):
+        """Las páginas devuelven filas con las columnas pedidas y no cargan objetos en la sesión."""
+        users = get_users(limit=2)
+        self.assertEqual([tuple(row) for row in users.items],
+                         [(1, "user1", "user1@example.com", "jugador"), (2, "user2", "user2@example.com", "jugador")])
+        self.assertIsNotNone(users.next_cursor)
+
+        questions = get_questions(limit=10, after=[3])
+        self.assertEqual([row.id for row in questions.items], [4, 5])
+        self.assertEqual(questions.items[0].option_2, "B")
+        self.assertIsNone(questions.next_cursor)
+
+        self.assertFalse(any(isinstance(row, (User, Question)) for row in users.items + questions.items))
+        self.assertEqual(len(db.session.identity_map), 0)
+
+
+    def test_rankings_join_user_name_in_one_statement(self):
+        """El ranking trae el nombre del usuario en la misma consulta."""
+        with count_queries() as counter:
+            rows = list(rankings_since(1, after_id=2))
+        self.assertEqual(counter.count, 1)
+        self.assertEqual([(row.user_id, row.user_name, row.score) for row in rows],
+                         [(3, "user3", 30), (4, "user4", 40), (5, "user5", 50)])
+
+        self.assertEqual([row.user_name for row in iter_ranking(1)], ["user5", "user4", "user3", "user2", "user1"])
+        self.assertEqual(len(list(iter_questions())), 5)
+        self.assertEqual(len(db.session.identity_map), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,30 +4,33 @@ import os
 # Asegúrate de que el directorio `app` esté en el path de Python
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app')))
 
-from app import create_app
-
+import sqlite3
 import unittest
+from concurrent.futures import Future
 from app import create_app
+from app.config import TestingConfig
 from flask import json
 from app.models import db, User, Question, Trivia, Ranking
 from werkzeug.security import generate_password_hash
+from app.instrumentation import count_queries
+from app.crud import update_user, configure_write_behind, flush_submissions, bulk_create_questions
+from app import security, response_cache, versions
+from app.models import Participate
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError, IntegrityError
+from unittest import mock
 
 # Clase de pruebas unitarias para las rutas
 class TestRoutes(unittest.TestCase):
 
     def setUp(self):
         """Crear la aplicación y un cliente de prueba para cada prueba."""
-        self.app = create_app()
+        # Base de datos de prueba: SQLite en memoria o TEST_DATABASE_URL
+        self.app = create_app(TestingConfig)
         self.client = self.app.test_client()
         self.app_context = self.app.app_context()
         self.app_context.push()
 
-        # Configura la base de datos para pruebas en memoria
-        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'  
-        self.app.config['TESTING'] = True
-        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-        db.init_app(self.app)  
-
         # Crear las tablas en la base de datos de prueba
         with self.app.app_context():
             db.create_all()  
@@ -630,3 +633,657 @@ class TestRoutes(unittest.TestCase):
         self.assertEqual(response_data['data']['ranking'][1]['user_name'], "User 1")
 
 
+
+
+    def _crear_trivias(self, cantidad):
+        """Crear varias trivias con preguntas y usuarios asociados."""
+        for i in range(cantidad):
+            trivia = Trivia(name=f"Trivia {i}", description="Carga", questions=[self.question1, self.question2], users=[self.user])
+            db.session.add(trivia)
+        # Se crean sin pasar por crud: hay que invalidar las respuestas cacheadas
+        versions.bump(versions.TRIVIAS)
+        db.session.commit()
+        db.session.expunge_all()
+
+
+    def test_trivias_query_count_is_constant(self):
+        """El número de consultas de GET /trivias no depende del número de trivias."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+
+        self._crear_trivias(2)
+        with count_queries() as few:
+            response = self.client.get('/trivias', headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+        self._crear_trivias(20)
+        with count_queries() as many:
+            response = self.client.get('/trivias', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['data']), 23)
+
+        self.assertEqual(few.count, many.count)
+        self.assertLessEqual(many.count, 6)  # incluye la consulta de versiones de la caché
+
+
+    def test_trivia_detail_and_user_trivias_query_count(self):
+        """GET /trivias/<id> y GET /users/<id>/trivias usan un número fijo de consultas."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        user_id = self.user.id
+        self._crear_trivias(10)
+
+        with count_queries() as detail:
+            response = self.client.get(f'/trivias/{self.trivia_id}', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(detail.count, 4)
+
+        with count_queries() as user_trivias:
+            response = self.client.get(f'/users/{user_id}/trivias', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['data']), 11)
+        self.assertLessEqual(user_trivias.count, 4)
+
+
+    def test_questions_cursor_pagination(self):
+        """Recorrer GET /questions página por página con ?limit= y ?after=."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        for i in range(5):
+            db.session.add(Question(question_text=f"Pregunta {i}", correct_option="A", option_1="A", option_2="B", option_3="C", difficulty="fácil"))
+        db.session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            url = '/questions?limit=3' + (f'&after={cursor}' if cursor else '')
+            response = self.client.get(url, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json['data']), 3)
+            seen.extend(q['id'] for q in response.json['data'])
+            cursor = response.json['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(seen, sorted(seen))
+
+
+    def test_ranking_cursor_pagination_and_invalid_cursor(self):
+        """El ranking se pagina por (puntaje desc, id) y rechaza cursores inválidos."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        for score in [5, 9, 5, 1]:
+            db.session.add(Ranking(trivia_id=self.trivia_id, user_id=self.user.id, score=score))
+        db.session.commit()
+
+        first = self.client.get(f'/ranking/{self.trivia_id}?limit=2', headers=headers)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([r['score'] for r in first.json['data']['ranking']], [9, 5])
+
+        cursor = first.json['next_cursor']
+        second = self.client.get(f'/ranking/{self.trivia_id}?limit=2&after={cursor}', headers=headers)
+        self.assertEqual([r['score'] for r in second.json['data']['ranking']], [5, 1])
+        self.assertIsNone(second.json['next_cursor'])
+
+        invalid = self.client.get(f'/ranking/{self.trivia_id}?after=no-es-un-cursor', headers=headers)
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(self.client.get('/users?limit=0', headers=headers).status_code, 400)
+
+
+    def test_export_questions_streaming(self):
+        """Exportar las preguntas en JSON y NDJSON."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+
+        response = self.client.get('/questions/export', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['data']), 2)
+        self.assertEqual(response.json['data'][0]['question_text'], "¿Cuál es la capital de Francia?")
+
+        response = self.client.get('/questions/export?format=ndjson', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([q['id'] for q in lines], [self.question1.id, self.question2.id])
+
+        self.assertEqual(self.client.get('/questions/export?format=xml', headers=headers).status_code, 400)
+
+
+    def test_export_ranking_streaming(self):
+        """Exportar el ranking completo de una trivia ordenado por puntaje."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        for score in [3, 7]:
+            db.session.add(Ranking(trivia_id=self.trivia_id, user_id=self.user.id, score=score))
+        db.session.commit()
+
+        response = self.client.get(f'/ranking/{self.trivia_id}/export', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['score'] for r in response.json['data']], [7, 3])
+        self.assertEqual(response.json['data'][0]['user_name'], "Test User")
+
+
+    def test_ranking_position(self):
+        """Posición de un usuario en el ranking con sus vecinos."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        other = User(name="Otro", email="otro@example.com", password="password", role="jugador")
+        db.session.add(other)
+        db.session.commit()
+
+        db.session.add(Ranking(trivia_id=self.trivia_id, user_id=other.id, score=9))
+        db.session.add(Ranking(trivia_id=self.trivia_id, user_id=self.user.id, score=4))
+        db.session.commit()
+
+        response = self.client.get(f'/ranking/{self.trivia_id}/users/{self.user.id}?radius=1', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['data']['rank'], 2)
+        self.assertEqual(response.json['data']['above'][0]['user_name'], "Otro")
+        self.assertEqual(response.json['data']['below'], [])
+
+        # Un puntaje nuevo registrado por /participate actualiza el leaderboard
+        data = {
+            'user_name': 'Test User',
+            'trivia_id': self.trivia_id,
+            'answers': {str(self.question1.id): 'option_2', str(self.question2.id): 'option_2'}
+        }
+        self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        response = self.client.get(f'/ranking/{self.trivia_id}', headers=headers)
+        self.assertEqual(len(response.json['data']['ranking']), 3)
+
+        response = self.client.get(f'/ranking/{self.trivia_id}/users/9999', headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+
+    def test_leaderboard_follows_changes_from_other_processes(self):
+        """El leaderboard se reconstruye si otro proceso cambia un nombre o reutiliza la trivia."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        other = User(name="Otro", email="otro@example.com", password="password", role="jugador")
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+        db.session.add(Ranking(trivia_id=self.trivia_id, user_id=other_id, score=9))
+        db.session.commit()
+
+        response = self.client.get(f'/ranking/{self.trivia_id}', headers=headers)
+        self.assertEqual(response.json['data']['ranking'][0]['user_name'], "Otro")
+
+        # Otro proceso cambia el nombre del usuario: no invalida los leaderboards de este proceso
+        db.session.execute(text("UPDATE user SET name = 'Renombrado' WHERE id = :id"), {"id": other_id})
+        versions.bump(versions.USERS)
+        db.session.commit()
+        response = self.client.get(f'/ranking/{self.trivia_id}', headers=headers)
+        self.assertEqual(response.json['data']['ranking'][0]['user_name'], "Renombrado")
+
+        # Otro proceso elimina la trivia y crea una nueva con el mismo id
+        for table in ('ranking', 'participate', 'trivia_questions', 'trivia_users'):
+            db.session.execute(text(f"DELETE FROM {table} WHERE trivia_id = :id"), {"id": self.trivia_id})
+        db.session.execute(text("DELETE FROM trivia WHERE id = :id"), {"id": self.trivia_id})
+        db.session.execute(text("INSERT INTO trivia (id, name, description) VALUES (:id, 'Nueva', 'Otra')"),
+                           {"id": self.trivia_id})
+        versions.bump(versions.trivia(self.trivia_id))
+        db.session.commit()
+        response = self.client.get(f'/ranking/{self.trivia_id}', headers=headers)
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(f'/ranking/{self.trivia_id}/users/{other_id}', headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+
+    def test_identity_cache(self):
+        """El middleware consulta el usuario una sola vez y la caché se invalida al modificarlo."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        user_id = self.user.id
+        self.client.get('/users', headers=headers)
+
+        with count_queries() as cached:
+            response = self.client.get('/users', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('user.role' in sql and 'WHERE user.id' in sql for sql in cached.statements))
+
+        # Al quitarle el rol de admin el siguiente request ya no está autorizado
+        self.client.put(f'/users/{user_id}', json={"role": "jugador"}, headers=headers)
+        self.assertEqual(self.client.get('/users', headers=headers).status_code, 403)
+
+        # Contadores expuestos en /status
+        update_user(user_id, {"role": "admin"})
+        stats = self.client.get('/status', headers=headers).json['data']['identity_cache']
+        self.assertGreater(stats['hits'], 0)
+        self.assertGreater(stats['misses'], 0)
+
+
+    def test_login_upgrades_password_hash(self):
+        """Un hash con un costo antiguo se reemplaza por el método configurado al hacer login."""
+        old_hash = generate_password_hash("oldpassword", "pbkdf2:sha256:1000")
+        user = User(name="Old Hash", email="oldhash@example.com", password=old_hash, role="jugador")
+        db.session.add(user)
+        db.session.commit()
+
+        response = self.client.post('/login', json={'email': 'oldhash@example.com', 'password': 'oldpassword'})
+        self.assertEqual(response.status_code, 200)
+
+        db.session.refresh(user)
+        self.assertNotEqual(user.password, old_hash)
+        self.assertTrue(user.password.startswith(self.app.config['PASSWORD_HASH_METHOD'] + '$'))
+
+        # El nuevo hash sigue siendo válido
+        response = self.client.post('/login', json={'email': 'oldhash@example.com', 'password': 'oldpassword'})
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_login_rejected_when_hash_queue_is_full(self):
+        """Con la cola de hash llena el login responde 503 en vez de esperar."""
+        security.configure(self.app.config['PASSWORD_HASH_METHOD'], workers=1, queue_limit=1)
+        try:
+            security._slots.acquire()
+            response = self.client.post('/login', json={'email': self.user.email, 'password': 'testpassword'})
+            self.assertEqual(response.status_code, 503)
+
+            security._slots.release()
+            response = self.client.post('/login', json={'email': self.user.email, 'password': 'testpassword'})
+            self.assertEqual(response.status_code, 200)
+        finally:
+            security.configure(
+                self.app.config['PASSWORD_HASH_METHOD'],
+                self.app.config['PASSWORD_HASH_WORKERS'],
+                self.app.config['PASSWORD_HASH_QUEUE_LIMIT']
+            )
+
+
+    def test_login_and_register_busy_when_hash_times_out(self):
+        """Un hash que no termina a tiempo responde 503 en login y registro."""
+        security.configure(self.app.config['PASSWORD_HASH_METHOD'], workers=1, queue_limit=1, timeout=0.01)
+        executor = mock.Mock()
+        executor.submit.side_effect = lambda *args: Future()  # nunca termina
+        try:
+            with mock.patch.object(security, '_get_executor', return_value=executor):
+                response = self.client.post('/login', json={'email': self.user.email, 'password': 'testpassword'})
+                self.assertEqual(response.status_code, 503)
+                response = self.client.post('/register', json={'name': 'Nuevo', 'email': 'nuevo@example.com', 'password': 'password123'})
+                self.assertEqual(response.status_code, 503)
+
+            # Las operaciones canceladas antes de empezar liberaron su lugar en la cola
+            self.assertTrue(security._slots.acquire(blocking=False))
+            security._slots.release()
+
+            # Un hash que ya está corriendo conserva su lugar hasta terminar
+            running = Future()
+            running.set_running_or_notify_cancel()
+            executor.submit.side_effect = lambda *args: running
+            with mock.patch.object(security, '_get_executor', return_value=executor):
+                response = self.client.post('/login', json={'email': self.user.email, 'password': 'testpassword'})
+                self.assertEqual(response.status_code, 503)
+                response = self.client.post('/login', json={'email': self.user.email, 'password': 'testpassword'})
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(executor.submit.call_count, 3)  # el segundo se rechazó sin enviarse
+
+            running.set_result(False)
+            self.assertTrue(security._slots.acquire(blocking=False))
+            security._slots.release()
+        finally:
+            security.configure(
+                self.app.config['PASSWORD_HASH_METHOD'],
+                self.app.config['PASSWORD_HASH_WORKERS'],
+                self.app.config['PASSWORD_HASH_QUEUE_LIMIT']
+            )
+
+
+    def test_bulk_create_questions(self):
+        """Importar preguntas en lote con errores por fila, como arreglo JSON y como NDJSON."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        rows = [
+            {"question_text": "¿2 + 2?", "correct_option": "4", "options": ["3", "4", "5"], "difficulty": "fácil"},
+            {"question_text": "Sin opciones", "correct_option": "A", "options": ["A", "B"], "difficulty": "fácil"},
+            {"question_text": "Sin dificultad", "correct_option": "A", "options": ["A", "B", "C"]},
+            {"question_text": "¿3 * 3?", "correct_option": "9", "options": ["6", "9", "12"], "difficulty": "medio"},
+        ]
+
+        response = self.client.post('/questions/bulk', json=rows, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['data']['inserted'], 2)
+        self.assertEqual([e['index'] for e in response.json['data']['errors']], [1, 2])
+
+        body = "\n".join(json.dumps(row) for row in rows) + "\nesto no es json\n"
+        response = self.client.post('/questions/bulk', data=body, content_type='application/x-ndjson', headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['data']['inserted'], 2)
+        self.assertEqual(response.json['data']['errors'][-1], {"index": 4, "message": "JSON inválido"})
+
+        self.assertEqual(Question.query.count(), 6)
+
+
+    def test_bulk_create_questions_retries_only_locked_row(self):
+        """Un lock en la fila N del modo fila por fila reintenta solo esa fila, sin duplicar las anteriores."""
+        rows = [
+            {"question_text": f"Pregunta {i}", "correct_option": "A", "options": ["A", "B", "C"], "difficulty": "fácil"}
+            for i in range(5)
+        ]
+        rows[1]["question_text"] = None  # obliga al modo fila por fila
+        attempts = []
+
+        def lock_row_3(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("INSERT INTO question") and not executemany and "Pregunta 3" in str(parameters):
+                attempts.append(1)
+                if len(attempts) == 1:
+                    raise OperationalError(statement, parameters, sqlite3.OperationalError("database is locked"))
+
+        start = Question.query.count()
+        event.listen(db.engine, 'before_cursor_execute', lock_row_3)
+        try:
+            with mock.patch('app.sqlite_profile.time.sleep'):
+                inserted, errors = bulk_create_questions(rows)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', lock_row_3)
+
+        self.assertEqual(inserted, 4)
+        self.assertEqual([position for position, _ in errors], [1])
+        self.assertEqual(len(attempts), 2)  # la fila 3 bloqueada y su reintento
+        texts = [q.question_text for q in Question.query.order_by(Question.id)][start:]
+        self.assertEqual(texts, ["Pregunta 0", "Pregunta 2", "Pregunta 3", "Pregunta 4"])
+
+
+    def test_create_and_update_trivia_query_count(self):
+        """Crear y actualizar una trivia con muchas preguntas y usuarios usa un número fijo de consultas."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        questions = [Question(question_text=f"P{i}", correct_option="A", option_1="A", option_2="B", option_3="C", difficulty="fácil") for i in range(120)]
+        users = [User(name=f"U{i}", email=f"u{i}@example.com", password="password") for i in range(60)]
+        db.session.add_all(questions + users)
+        db.session.commit()
+        question_ids = [q.id for q in questions]
+        user_ids = [u.id for u in users]
+
+        data = {"name": "Grande", "description": "Muchas preguntas", "user_ids": user_ids, "question_ids": question_ids}
+        with count_queries() as create:
+            response = self.client.post('/trivias', json=data, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json['data']['users']), 60)
+        self.assertLessEqual(create.count, 10)
+
+        trivia_id = response.json['data']['id']
+        update = {"question_ids": question_ids[:10] + [999999], "user_ids": user_ids[:5]}
+        with count_queries() as updated:
+            response = self.client.put(f'/trivias/{trivia_id}', json=update, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(updated.count, 10)
+
+        trivia = self.client.get(f'/trivias/{trivia_id}', headers=headers).json['data']['trivia']
+        self.assertEqual(len(trivia['questions']), 10)
+        self.assertEqual(len(trivia['users']), 5)
+
+
+    def test_trivia_ids_must_be_integers(self):
+        """Booleanos, decimales y textos no numéricos en las listas de ids responden 400."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        question_id = self.question1.id
+        for bad_ids in ([True], [question_id, 1.9], ["abc"], [None], str(question_id)):
+            data = {"name": "Ids", "description": "Inválidos", "user_ids": [self.user.id], "question_ids": bad_ids}
+            response = self.client.post('/trivias', json=data, headers=headers)
+            self.assertEqual(response.status_code, 400, bad_ids)
+
+            response = self.client.put(f'/trivias/{self.trivia_id}', json={"question_ids": bad_ids}, headers=headers)
+            self.assertEqual(response.status_code, 400, bad_ids)
+
+        # Los textos con dígitos se aceptan como enteros
+        data = {"name": "Ids", "description": "Texto", "user_ids": [str(self.user.id)], "question_ids": [str(question_id)]}
+        response = self.client.post('/trivias', json=data, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        trivia = self.client.get(f'/trivias/{self.trivia_id}', headers=headers).json['data']['trivia']
+        self.assertEqual(len(trivia['questions']), 2)
+
+
+    def test_participate_uses_compiled_answer_key(self):
+        """La corrección usa la clave precompilada y se invalida al modificar una pregunta."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        question2_id = self.question2.id
+        data = {
+            'user_name': 'Test User',
+            'trivia_id': self.trivia_id,
+            'answers': {str(self.question1.id): 'option_2', str(question2_id): 'option_2'}
+        }
+
+        response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        self.assertEqual(response.json['data']['score'], 2)
+
+        # Con la clave en caché no se vuelven a leer las preguntas
+        with count_queries() as cached:
+            response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(any('FROM question' in sql for sql in cached.statements))
+
+        # Cambiar la dificultad invalida la clave y cambia el puntaje
+        self.client.put(f'/questions/{question2_id}', json={"difficulty": "difícil"}, headers=headers)
+        response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        self.assertEqual(response.json['data']['score'], 3)
+
+        # Preguntas que no pertenecen a la trivia
+        data['answers'] = {str(self.question1.id): 'option_2', '999999': 'option_1'}
+        response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_answer_key_follows_changes_from_other_processes(self):
+        """Una clave en caché se vuelve a compilar si otro proceso cambia las versiones."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        question2_id = self.question2.id
+        data = {
+            'user_name': 'Test User',
+            'trivia_id': self.trivia_id,
+            'answers': {str(self.question1.id): 'option_1', str(question2_id): 'option_3'}
+        }
+        response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        self.assertEqual(response.json['data']['score'], 0)
+
+        # Otro proceso cambia la respuesta correcta: no invalida la caché de este proceso
+        db.session.execute(text("UPDATE question SET correct_option = 'Roma' WHERE id = :id"), {"id": question2_id})
+        versions.bump(versions.QUESTIONS)
+        db.session.commit()
+        response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        self.assertEqual(response.json['data']['score'], 2)
+
+        # Otro proceso elimina la trivia: ya no se aceptan participaciones
+        for table in ('ranking', 'participate', 'trivia_questions', 'trivia_users'):
+            db.session.execute(text(f"DELETE FROM {table} WHERE trivia_id = :id"), {"id": self.trivia_id})
+        db.session.execute(text("DELETE FROM trivia WHERE id = :id"), {"id": self.trivia_id})
+        versions.bump(versions.trivia(self.trivia_id))
+        db.session.commit()
+        response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+
+    def test_participate_batch(self):
+        """Registrar un lote de participaciones con resultados por entrada."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        answers = {str(self.question1.id): 'option_2', str(self.question2.id): 'option_2'}
+        submissions = [
+            {'user_name': 'Test User', 'trivia_id': self.trivia_id, 'answers': answers},
+            {'user_name': 'Nadie', 'trivia_id': self.trivia_id, 'answers': answers},
+            {'user_name': 'Test User', 'trivia_id': 999, 'answers': answers},
+            {'user_name': 'Test User', 'trivia_id': self.trivia_id, 'answers': {str(self.question1.id): 'option_1'}},
+        ] + [{'user_name': 'Test User', 'trivia_id': self.trivia_id, 'answers': answers}] * 20
+
+        with count_queries() as queries:
+            response = self.client.post('/participate/batch', json={'submissions': submissions}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['data']['registered'], 21)
+        self.assertLessEqual(queries.count, 10)
+
+        results = response.json['data']['results']
+        self.assertEqual([r['code'] for r in results[:4]], ['201', '404', '404', '400'])
+        self.assertEqual(results[0]['score'], 2)
+
+        ranking = self.client.get(f'/ranking/{self.trivia_id}?limit=100', headers=headers)
+        self.assertEqual(len(ranking.json['data']['ranking']), 21)
+
+
+    def test_participate_batch_rolls_back_on_database_errors(self):
+        """Un lote que falla al guardarse no deja participaciones y responde 400 o 503."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        answers = {str(self.question1.id): 'option_2', str(self.question2.id): 'option_2'}
+        body = {'submissions': [{'user_name': 'Test User', 'trivia_id': self.trivia_id, 'answers': answers}] * 3}
+        failures = []
+
+        def fail_ranking_insert(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("INSERT INTO ranking") and failures:
+                raise failures[0](statement, parameters, sqlite3.OperationalError(failures[1]))
+
+        event.listen(db.engine, 'before_cursor_execute', fail_ranking_insert)
+        try:
+            failures[:] = [IntegrityError, "FOREIGN KEY constraint failed"]
+            response = self.client.post('/participate/batch', json=body, headers=headers)
+            self.assertEqual(response.status_code, 400)
+
+            failures[:] = [OperationalError, "database is locked"]
+            with mock.patch('app.sqlite_profile.time.sleep'):
+                response = self.client.post('/participate/batch', json=body, headers=headers)
+            self.assertEqual(response.status_code, 503)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', fail_ranking_insert)
+
+        # Las filas de participate insertadas antes del fallo se descartaron
+        self.assertEqual(Participate.query.filter_by(trivia_id=self.trivia_id).count(), 0)
+        response = self.client.post('/participate/batch', json=body, headers=headers)
+        self.assertEqual(response.json['data']['registered'], 3)
+
+
+    def test_participate_single_commit_and_no_orphans(self):
+        """Una participación hace un solo commit y un fallo no deja participaciones sin ranking."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        data = {
+            'user_name': 'Test User',
+            'trivia_id': self.trivia_id,
+            'answers': {str(self.question1.id): 'option_2', str(self.question2.id): 'option_2'}
+        }
+
+        commits = []
+        listener = lambda connection: commits.append(1)
+        event.listen(db.engine, 'commit', listener)
+        try:
+            response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        finally:
+            event.remove(db.engine, 'commit', listener)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(commits), 1)
+
+        # Falla al crear el ranking: la participación tampoco se guarda
+        before = Participate.query.count()
+        with mock.patch('app.crud.Ranking', side_effect=RuntimeError("fallo inyectado")):
+            response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(Participate.query.count(), before)
+        self.assertEqual(Participate.query.count(), Ranking.query.count())
+
+
+    def test_trivia_etag_not_modified(self):
+        """GET /trivias/<id> con If-None-Match vigente responde 304 sin consultar la trivia."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        response = self.client.get(f'/trivias/{self.trivia_id}', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+
+        with count_queries() as queries:
+            response = self.client.get(f'/trivias/{self.trivia_id}', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.data, b"")
+        self.assertLessEqual(queries.count, 1)
+
+        # Modificar la trivia o una de sus preguntas cambia el ETag
+        self.client.put(f'/trivias/{self.trivia_id}', json={"name": "Otro nombre"}, headers=headers)
+        response = self.client.get(f'/trivias/{self.trivia_id}', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['data']['trivia']['name'], "Otro nombre")
+
+        etag = response.headers['ETag']
+        self.client.put(f'/questions/{self.question1.id}', json={"question_text": "¿Capital de Francia?"}, headers=headers)
+        response = self.client.get(f'/trivias/{self.trivia_id}', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_ranking_etag_changes_on_participate(self):
+        """El ETag del ranking cambia con cada participación y depende de la página pedida."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        data = {
+            'user_name': 'Test User',
+            'trivia_id': self.trivia_id,
+            'answers': {str(self.question1.id): 'option_2', str(self.question2.id): 'option_2'}
+        }
+        self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+
+        etag = self.client.get(f'/ranking/{self.trivia_id}', headers=headers).headers['ETag']
+        response = self.client.get(f'/ranking/{self.trivia_id}', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        other_page = self.client.get(f'/ranking/{self.trivia_id}?limit=1', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(other_page.status_code, 200)
+
+        self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+        response = self.client.get(f'/ranking/{self.trivia_id}', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['data']['ranking']), 2)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+
+    def test_response_cache_hits_and_invalidation(self):
+        """Las lecturas repetidas se sirven desde la caché y una escritura invalida la entrada."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        first = self.client.get(f'/trivias/{self.trivia_id}', headers=headers)
+        self.assertEqual(first.status_code, 200)
+
+        before = response_cache.stats()
+        with count_queries() as queries:
+            second = self.client.get(f'/trivias/{self.trivia_id}', headers=headers)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(response_cache.stats()['hits'], before['hits'] + 1)
+        self.assertLessEqual(queries.count, 1)
+
+        # Actualizar la trivia elimina la entrada y la siguiente lectura trae el dato nuevo
+        self.client.put(f'/trivias/{self.trivia_id}', json={"name": "Renombrada"}, headers=headers)
+        self.assertGreater(response_cache.stats()['invalidations'], before['invalidations'])
+        response = self.client.get(f'/trivias/{self.trivia_id}', headers=headers)
+        self.assertEqual(response.json['data']['trivia']['name'], "Renombrada")
+
+        # Un cambio hecho por otro proceso (sin invalidación local) se detecta por la versión
+        with mock.patch.object(versions, '_listeners', []):
+            self.client.put(f'/trivias/{self.trivia_id}', json={"name": "Desde otro proceso"}, headers=headers)
+        response = self.client.get(f'/trivias/{self.trivia_id}', headers=headers)
+        self.assertEqual(response.json['data']['trivia']['name'], "Desde otro proceso")
+
+
+    def test_response_cache_is_bounded_by_bytes(self):
+        """La caché descarta las entradas menos usadas al superar su tamaño en bytes."""
+        cache = response_cache.ResponseCache(max_bytes=4000)
+        for i in range(10):
+            entry = response_cache.CachedResponse("etag", b"x" * 500, "application/json", frozenset({f"trivia:{i}"}), 700)
+            cache.set(("/trivias", str(i)), entry)
+
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 4000)
+        self.assertEqual(stats['entries'], 5)
+        self.assertEqual(stats['evictions'], 5)
+        self.assertIsNone(cache.get(("/trivias", "0"), "etag"))
+        self.assertIsNotNone(cache.get(("/trivias", "9"), "etag"))
+
+        cache.invalidate(["trivia:9"])
+        self.assertIsNone(cache.get(("/trivias", "9"), "etag"))
+
+
+    def test_participate_write_behind(self):
+        """Con escritura diferida la participación responde 202 y se guarda en segundo plano."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        data = {
+            'user_name': 'Test User',
+            'trivia_id': self.trivia_id,
+            'answers': {str(self.question1.id): 'option_2', str(self.question2.id): 'option_2'}
+        }
+
+        configure_write_behind(self.app, max_size=100)
+        try:
+            response = self.client.post(f'/participate/{self.trivia_id}', json=data, headers=headers)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.json['data']['score'], 2)
+
+            flush_submissions()
+            status = self.client.get('/status', headers=headers).json['data']['write_behind']
+            self.assertEqual(status['written'], 1)
+            self.assertEqual(status['depth'], 0)
+        finally:
+            configure_write_behind(self.app, max_size=0)
+
+        db.session.remove()
+        self.assertEqual(Ranking.query.filter_by(trivia_id=self.trivia_id).count(), 1)
+        ranking = self.client.get(f'/ranking/{self.trivia_id}', headers=headers)
+        self.assertEqual(ranking.json['data']['ranking'][0]['score'], 2)
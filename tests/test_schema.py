@@ -0,0 +1,80 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from app import create_app
+from app.config import TestingConfig
+from app.models import db, User, Participate, Ranking
+from app.schema import ensure_indexes
+
+
+# Pruebas de los índices secundarios: cada consulta frecuente debe usar un índice
+class TestSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        # Los planes de consulta son propios de SQLite
+        if db.engine.dialect.name != 'sqlite':
+            self.app_context.pop()
+            self.skipTest("EXPLAIN QUERY PLAN solo aplica a SQLite")
+        db.create_all()
+
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+
+    def _query_plan(self, query):
+        """Devolver el EXPLAIN QUERY PLAN de una consulta del ORM."""
+        compiled = query.statement.compile(db.engine)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        with db.engine.connect() as connection:
+            rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+        return " | ".join(row[-1] for row in rows)
+
+
+    def test_user_by_name_uses_index(self):
+        plan = self._query_plan(User.query.filter_by(name="Test User"))
+        self.assertIn("USING INDEX ix_user_name", plan)
+
+
+    def test_ranking_by_trivia_and_score_uses_index(self):
+        query = Ranking.query.filter_by(trivia_id=1).order_by(Ranking.score.desc(), Ranking.id.asc()).limit(50)
+        plan = self._query_plan(query)
+        self.assertIn("USING INDEX ix_ranking_trivia_score", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+    def test_ranking_sync_uses_trivia_id_range(self):
+        """La sincronización de un leaderboard lee solo las filas nuevas, ya ordenadas por id."""
+        query = Ranking.query.filter(Ranking.trivia_id == 1, Ranking.id > 100).order_by(Ranking.id)
+        plan = self._query_plan(query)
+        self.assertIn("USING INDEX ix_ranking_trivia_id (trivia_id=? AND id>?)", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+    def test_participation_by_trivia_and_user_uses_index(self):
+        plan = self._query_plan(Participate.query.filter_by(trivia_id=1, user_name="Test User"))
+        self.assertIn("USING INDEX ix_participate_trivia_user", plan)
+
+
+    def test_ensure_indexes_upgrades_existing_database(self):
+        """Una base de datos creada antes de los índices los recibe con ensure_indexes."""
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_user_name")
+            connection.exec_driver_sql("DROP INDEX ix_ranking_trivia_score")
+
+        created = ensure_indexes(db.engine)
+        self.assertEqual(sorted(created), ["ix_ranking_trivia_score", "ix_user_name"])
+        self.assertEqual(ensure_indexes(db.engine), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from sqlalchemy import text
+from werkzeug.security import generate_password_hash
+from app import create_app, search
+from app.config import TestingConfig
+from app.migrations import migrate
+from app.models import db, User, Question
+
+
+# Quitar todo lo que crean las migraciones (también con una base de datos en archivo)
+def drop_migrated_schema():
+    db.drop_all()
+    with db.engine.begin() as connection:
+        search.drop_index(connection)
+        connection.execute(text("DROP TABLE IF EXISTS schema_version"))
+
+
+# Pruebas de la búsqueda de preguntas con FTS5
+class TestQuestionSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        if db.engine.dialect.name != 'sqlite':
+            self.app_context.pop()
+            self.skipTest("FTS5 solo está disponible en SQLite")
+        migrate(db.engine)
+
+        db.session.add(User(name="Admin", email="admin@example.com", password=generate_password_hash("password"), role="admin"))
+        db.session.commit()
+        token = self.client.post('/login', json={'email': 'admin@example.com', 'password': 'password'}).json['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        db.session.remove()
+        drop_migrated_schema()
+        self.app_context.pop()
+
+    def create(self, text, options=("París", "Roma", "Madrid"), difficulty="fácil"):
+        response = self.client.post('/questions', headers=self.headers, json={
+            "question_text": text, "correct_option": options[0], "options": list(options), "difficulty": difficulty
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.json['data']['id']
+
+    def search(self, query, **params):
+        response = self.client.get('/questions/search', headers=self.headers, query_string={'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json
+
+    def ids(self, query, **params):
+        return [question['id'] for question in self.search(query, **params)['data']]
+
+
+    def test_index_follows_create_update_and_delete(self):
+        """Crear, editar y borrar preguntas actualiza el índice."""
+        question_id = self.create("¿Cuál es la capital de Francia?")
+        self.assertEqual(self.ids("capital"), [question_id])
+        self.assertEqual(self.ids("roma"), [question_id])
+
+        response = self.client.put(f'/questions/{question_id}', headers=self.headers, json={"question_text": "¿Dónde está la Torre Eiffel?"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.ids("capital"), [])
+        self.assertEqual(self.ids("eiffel"), [question_id])
+
+        self.client.delete(f'/questions/{question_id}', headers=self.headers)
+        self.assertEqual(self.ids("eiffel"), [])
+
+
+    def test_bulk_import_is_searchable(self):
+        """Las preguntas importadas en bloque también se indexan."""
+        response = self.client.post('/questions/bulk', headers=self.headers, json=[
+            {"question_text": f"Volcán número {i}", "correct_option": "A", "options": ["A", "B", "C"], "difficulty": "medio"}
+            for i in range(30)
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.search("volcan")['length'], 30)
+
+
+    def test_ranking_filters_and_pagination(self):
+        """El texto de la pregunta pesa más que las opciones; se filtra por dificultad y se pagina sin repetir."""
+        in_option = self.create("¿Qué ciudad es la más poblada?", options=("Tokio", "Lima", "Geografía"))
+        in_text = self.create("Geografía: ¿cuál es el río más largo?", options=("Nilo", "Amazonas", "Danubio"), difficulty="difícil")
+        self.assertEqual(self.ids("geografia"), [in_text, in_option])
+        self.assertEqual(self.ids("geog"), [in_text, in_option])
+        self.assertEqual(self.ids("geografia", difficulty="difícil"), [in_text])
+
+        expected = [self.create(f"Historia del arte {i}") for i in range(7)]
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 3, **({'after': cursor} if cursor else {})}
+            page = self.search("historia arte", **params)
+            seen += [question['id'] for question in page['data']]
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), expected)
+
+
+    def test_invalid_parameters(self):
+        """Sin palabras o con una dificultad desconocida se responde 400; la sintaxis de FTS5 no se interpreta."""
+        self.create("¿Cuál es la capital de Francia?")
+        for params in ({'q': ''}, {'q': '"*()'}, {'q': 'capital', 'difficulty': 'imposible'}):
+            response = self.client.get('/questions/search', headers=self.headers, query_string=params)
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.ids('capital: "francia" (')), 1)
+        # AND y OR se buscan como palabras
+        self.assertEqual(self.ids('capital AND francia'), [])
+
+
+    def test_rebuild_indexes_existing_rows(self):
+        """rebuild indexa las preguntas guardadas sin los triggers (bases de datos existentes)."""
+        with db.engine.begin() as connection:
+            search.drop_triggers(connection)
+        db.session.add(Question(question_text="Planeta rojo", correct_option="Marte", option_1="Marte",
+                                option_2="Venus", option_3="Júpiter", difficulty="fácil"))
+        db.session.commit()
+        self.assertEqual(self.ids("planeta"), [])
+
+        with db.engine.begin() as connection:
+            search.create_triggers(connection)
+            search.rebuild(connection)
+        self.assertEqual(len(self.ids("planeta")), 1)
+
+
+    def test_like_fallback_without_fts_table(self):
+        """Una base de datos sin la tabla FTS (migración 3 sin aplicar) busca con LIKE en lugar de fallar."""
+        self.assertEqual(len(self.ids("capital")), 0)  # el resultado de has_index queda en caché
+        question_id = self.create("¿Cuál es la capital de Francia?")
+        with db.engine.begin() as connection:
+            search.drop_index(connection)
+            self.assertFalse(search.has_index(connection))
+
+        for _ in range(2):
+            self.assertEqual(self.ids("capital"), [question_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
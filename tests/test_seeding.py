@@ -0,0 +1,91 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from sqlalchemy import text
+from app import create_app, search
+from app.answer_keys import compile_answer_key, grade
+from app.config import TestingConfig
+from app.models import db, User, Question, Participate, Ranking
+from app.migrations import migrate
+from app.seeding import seed, SeedError, DIFFICULTIES, DEFAULT_PASSWORD, user_email
+
+PLAN = {"users": 200, "questions": 300, "trivias": 12, "participations": 1500}
+
+
+# Pruebas del generador de datos sintéticos
+class TestSeeding(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        migrate(db.engine)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        with db.engine.begin() as connection:
+            search.drop_index(connection)
+            connection.execute(text("DROP TABLE IF EXISTS schema_version"))
+        self.app_context.pop()
+
+    # Sembrar una base nueva (otra app en memoria) y devolver sus preguntas y participaciones
+    def seeded_snapshot(self, seed_value):
+        app = create_app(TestingConfig)
+        with app.app_context():
+            migrate(db.engine)
+            seed(db.engine, **PLAN, seed=seed_value)
+            return (
+                db.session.query(Question.question_text, Question.correct_option, Question.difficulty).order_by(Question.id).all(),
+                db.session.query(Participate.user_name, Participate.trivia_id, Participate.answers, Participate.score).order_by(Participate.id).all(),
+            )
+
+
+    def test_counts_and_login(self):
+        """Se insertan las cantidades pedidas y los usuarios pueden iniciar sesión."""
+        counts = seed(db.engine, **PLAN, batch_size=100)
+
+        self.assertEqual(counts["users"], db.session.query(User).count())
+        self.assertEqual(counts["participations"], 1500)
+        self.assertEqual(db.session.query(Ranking).count(), 1500)
+        self.assertEqual({row[0] for row in db.session.query(Question.difficulty).distinct()}, set(DIFFICULTIES))
+
+        response = self.app.test_client().post('/login', json={'email': user_email(2), 'password': DEFAULT_PASSWORD})
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_same_seed_same_data(self):
+        """La misma semilla produce los mismos datos; otra semilla, datos distintos."""
+        if db.engine.url.database not in (None, '', ':memory:'):
+            self.skipTest("Cada siembra necesita su propia base de datos en memoria")
+        first = self.seeded_snapshot(7)
+        self.assertEqual(self.seeded_snapshot(7), first)
+        self.assertNotEqual(self.seeded_snapshot(8), first)
+
+
+    def test_scores_match_grading_and_are_skewed(self):
+        """Los puntajes coinciden con la corrección de la API y la mayoría queda bajo la mitad del máximo."""
+        seed(db.engine, **PLAN)
+
+        below_half = 0
+        participations = db.session.query(Participate).order_by(Participate.id).limit(300).all()
+        for participation in participations:
+            key = compile_answer_key(participation.trivia_id)
+            self.assertEqual(grade(key, participation.answers)[0], participation.score)
+            if participation.score < sum(question.points for question in key.questions.values()) / 2:
+                below_half += 1
+        self.assertGreater(below_half, len(participations) / 2)
+
+
+    def test_requires_empty_database(self):
+        """No se siembra sobre una base de datos con usuarios."""
+        seed(db.engine, **PLAN)
+        with self.assertRaises(SeedError):
+            seed(db.engine, **PLAN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+from app import create_app
+from app.config import TestingConfig
+from app.models import db, User
+from app.server import release_connections, reset_after_fork
+from app.migrations import migrate
+
+
+# Pruebas de los hooks de los workers: las conexiones no se comparten entre procesos
+class TestServerHooks(unittest.TestCase):
+
+    def setUp(self):
+        self.db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+
+        class FileConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{self.db_file}'
+
+        self.app = create_app(FileConfig)
+        with self.app.app_context():
+            migrate(db.engine)
+
+    def tearDown(self):
+        release_connections(self.app)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_file + suffix):
+                os.remove(self.db_file + suffix)
+
+
+    def test_master_releases_connections_before_fork(self):
+        """Después de crear la app el master no conserva conexiones abiertas."""
+        release_connections(self.app)
+        with self.app.app_context():
+            self.assertEqual(db.engine.pool.checkedin(), 0)
+
+
+    def test_worker_starts_with_a_new_pool(self):
+        """Después del fork el worker usa un pool nuevo y abre sus propias conexiones."""
+        with self.app.app_context():
+            inherited = db.engine.pool
+            reset_after_fork(self.app)
+            self.assertIsNot(db.engine.pool, inherited)
+            self.assertEqual(db.session.query(User).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from app import sqlite_profile
+
+
+# Pruebas del perfil de producción de SQLite y del reintento ante "database is locked"
+class TestSqliteProfile(unittest.TestCase):
+
+    def setUp(self):
+        self.db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+
+    def tearDown(self):
+        sqlite_profile.configure(None)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_file + suffix):
+                os.remove(self.db_file + suffix)
+
+
+    def _pragmas(self):
+        engine = create_engine(f'sqlite:///{self.db_file}')
+        try:
+            with engine.connect() as connection:
+                return {
+                    pragma: connection.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                    for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size')
+                }
+        finally:
+            engine.dispose()
+
+
+    def test_profile_applied_on_connect(self):
+        """Cada conexión nueva recibe los PRAGMA del perfil."""
+        sqlite_profile.configure({"busy_timeout": 1234})
+        pragmas = self._pragmas()
+
+        self.assertEqual(pragmas['journal_mode'], 'wal')
+        self.assertEqual(pragmas['synchronous'], 1)  # NORMAL
+        self.assertEqual(pragmas['busy_timeout'], 1234)
+        self.assertEqual(pragmas['cache_size'], -64000)
+
+
+    def test_profile_disabled(self):
+        """Con el perfil desactivado se mantienen los valores por defecto de SQLite."""
+        sqlite_profile.configure(None)
+        self.assertEqual(self._pragmas()['journal_mode'], 'delete')
+
+
+    def test_profile_from_config(self):
+        """El perfil se arma desde la configuración y SQLITE_PROFILE=False lo desactiva."""
+        config = {'SQLITE_PROFILE': True, 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_BUSY_TIMEOUT': 100}
+        self.assertEqual(sqlite_profile.profile_from_config(config), {"synchronous": "FULL", "busy_timeout": 100})
+        self.assertIsNone(sqlite_profile.profile_from_config({'SQLITE_PROFILE': False}))
+
+        with self.assertRaises(ValueError):
+            sqlite_profile.configure({"temp_store": "MEMORY"})
+
+
+    def test_retry_on_locked(self):
+        """Las escrituras que reciben "database is locked" se reintentan; otros errores no."""
+        calls = []
+
+        @sqlite_profile.retry_on_locked
+        def write(error):
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError("INSERT", {}, error)
+            return "ok"
+
+        with mock.patch.object(sqlite_profile.time, 'sleep'), mock.patch.object(sqlite_profile.db, 'session'):
+            self.assertEqual(write(Exception("database is locked")), "ok")
+            self.assertEqual(len(calls), 3)
+
+            calls.clear()
+            with self.assertRaises(OperationalError):
+                write(Exception("no such table: user"))
+            self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
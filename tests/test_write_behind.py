@@ -0,0 +1,84 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import unittest
+from app.write_behind import WriteBehindQueue, QueueFull
+
+
+# Pruebas de la cola de escritura diferida con una función de escritura simulada
+class TestWriteBehind(unittest.TestCase):
+
+    def test_items_are_written_in_batches(self):
+        """Los elementos encolados se escriben en lotes y se notifican después del commit."""
+        batches = []
+        written = []
+        release = threading.Event()
+
+        def write_batch(items):
+            release.wait()
+            batches.append(list(items))
+            return [item * 10 for item in items]
+
+        write_queue = WriteBehindQueue(write_batch, lambda items, results: written.extend(results), batch_size=50)
+        for i in range(100):
+            write_queue.submit(i)
+        release.set()
+        write_queue.flush()
+
+        self.assertEqual(sorted(written), [i * 10 for i in range(100)])
+        self.assertLess(len(batches), 100)
+        self.assertTrue(all(len(batch) <= 50 for batch in batches))
+
+        stats = write_queue.stats()
+        self.assertEqual(stats['written'], 100)
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(stats['lag_seconds'], 0.0)
+        write_queue.stop()
+
+
+    def test_full_queue_rejects_after_timeout(self):
+        """Con la cola llena, submit rechaza el elemento después de esperar."""
+        release = threading.Event()
+
+        def write_batch(items):
+            release.wait()
+            return items
+
+        write_queue = WriteBehindQueue(write_batch, max_size=2, batch_size=1, enqueue_timeout=0.01)
+        write_queue.submit('a')  # lo toma el hilo escritor
+        write_queue._queue.put((0, 'relleno'))
+        write_queue._queue.put((0, 'relleno'))
+
+        with self.assertRaises(QueueFull):
+            write_queue.submit('b')
+        self.assertEqual(write_queue.stats()['rejected'], 1)
+        self.assertGreater(write_queue.lag(), 0)
+
+        release.set()
+        write_queue.stop()
+
+
+    def test_stop_flushes_pending_items(self):
+        """Al detener la cola se escriben los elementos pendientes; un error no afecta al resto."""
+        written = []
+
+        def write_batch(items):
+            if 'malo' in items:
+                raise ValueError("elemento inválido")
+            written.extend(items)
+            return items
+
+        write_queue = WriteBehindQueue(write_batch)
+        for item in ['a', 'malo', 'b', 'c']:
+            write_queue.submit(item)
+        write_queue.stop()
+
+        self.assertEqual(sorted(written), ['a', 'b', 'c'])
+        self.assertEqual(write_queue.stats()['failed'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()